@@ -1,26 +1,57 @@
 import os
 from src.data_handlers.route_data_manager import RouteDataManager
 from src.data_handlers.weather_data_manager import WeatherDataManager
+from src.data_handlers.forecast_sources import RecordedForecastSource
+from src.data_handlers.forecast_archive import ForecastArchive
 from src.recommenders.route_recommender import RouteRecommender
+from src.ui.image_pipeline import ImagePipeline
 from src.ui.user_interface import App
+from src.utils.tracing import tracer
 
 # ścieżka do pliku CSV z trasami
 CSV_PATH = os.path.join("data", "trails.csv")
 
+# opcjonalny katalog z nagranymi prognozami - aplikacja działa wtedy bez dostępu do API
+WEATHER_FIXTURES_DIR = os.environ.get("WEATHER_FIXTURES_DIR")
+
+# katalog archiwum pobranych prognoz (do analiz historycznych komfortu)
+FORECAST_ARCHIVE_DIR = os.path.join("data", "forecast_archive")
+
+# opcjonalny katalog śladów wyszukiwań (format Chrome trace-event, do otwarcia w ui.perfetto.dev)
+TRACE_DIR = os.environ.get("TRACE_DIR")
+
 def main():
 
     if not os.path.exists(CSV_PATH):
         print(f"Nie znaleziono pliku z danymi o trasach: {CSV_PATH}")
         return
 
+    if TRACE_DIR:
+        tracer.configure(os.path.join(TRACE_DIR, "trace.json"))
+
     # Inicjalizacja komponentów
     route_manager = RouteDataManager(trails_csv_path=CSV_PATH)
-    weather_manager = WeatherDataManager()
+    forecast_source = None
+    if WEATHER_FIXTURES_DIR:
+        forecast_source = RecordedForecastSource(WEATHER_FIXTURES_DIR, align_to_today=True)
+    weather_manager = WeatherDataManager(source=forecast_source, archive=ForecastArchive(FORECAST_ARCHIVE_DIR))
     recommender = RouteRecommender(route_manager, weather_manager)
 
+    # Odświeżanie prognoz w tle, aby pierwsze wyszukiwanie nie czekało na API
+    weather_manager.start_prefetch()
+    # Zmiany w pliku z trasami są wczytywane bez restartu aplikacji
+    route_manager.start_watching()
+
     # Uruchomienie aplikacji
-    app = App(recommender=recommender)
+    image_pipeline = ImagePipeline()
+    app = App(recommender=recommender, image_pipeline=image_pipeline)
     app.mainloop()
 
+    image_pipeline.shutdown()
+    route_manager.stop_watching()
+    weather_manager.stop_prefetch()
+    weather_manager.close()
+    tracer.close()
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
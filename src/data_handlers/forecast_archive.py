@@ -0,0 +1,176 @@
+import datetime
+import os
+import threading
+import time
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+
+from src.models.weather_data import WeatherData
+from src.utils.constants import FORECAST_MODEL_RUN_HOURS_UTC
+
+# Jeden rekord archiwum = jedna godzina prognozy wydanej w chwili issued_at
+ARCHIVE_DTYPE = np.dtype([
+    ("time", "<i8"),          # początek godziny, znacznik czasu UNIX (UTC)
+    ("issued_at", "<i8"),     # moment pobrania prognozy, znacznik czasu UNIX (UTC)
+    ("temperature", "<f4"),
+    ("precipitation_probability", "<f4"),
+    ("precipitation_amount", "<f4"),
+    ("sunshine_duration", "<f4"),
+    ("cloud_cover", "<f4"),
+])
+
+
+def _model_run_start(timestamp: float) -> int:
+    """Początek okna przebiegu modelu (FORECAST_MODEL_RUN_HOURS_UTC), w którym leży podany moment (UNIX, UTC)."""
+    day_start = int(timestamp) // 86400 * 86400
+    hour = (int(timestamp) - day_start) // 3600
+    earlier_runs = [run_hour for run_hour in FORECAST_MODEL_RUN_HOURS_UTC if run_hour <= hour]
+    if not earlier_runs:
+        return day_start - 86400 + max(FORECAST_MODEL_RUN_HOURS_UTC) * 3600
+    return day_start + max(earlier_runs) * 3600
+
+
+class ForecastArchive:
+    """
+    Archiwum godzinowych prognoz zapisywanych na dysku, tylko z dopisywaniem (append-only).
+
+    Dane są partycjonowane według lokalizacji i dnia (UTC):
+
+        <root_dir>/<szerokość>_<długość>/<RRRR-MM-DD>.bin
+
+    Każdy plik to ciąg rekordów ARCHIVE_DTYPE, odczytywany przez np.memmap - zapytanie obejmujące
+    wiele miesięcy wczytuje do pamięci tylko jeden dzień naraz. Archiwizowany jest jeden zestaw prognoz
+    na przebieg modelu: kolejne pobrania z tego samego okna przebiegu są pomijane. Ta sama godzina może
+    występować w pliku wielokrotnie (z kolejnych przebiegów); przy odczycie wybierana jest najnowsza prognoza.
+    """
+
+    def __init__(self, root_dir: str):
+        self._root_dir = root_dir
+        self._lock = threading.Lock()
+        # Katalog lokalizacji -> issued_at ostatniego zapisu
+        self._last_issued_at: dict[str, int] = {}
+        os.makedirs(root_dir, exist_ok=True)
+
+    @property
+    def root_dir(self) -> str:
+        return self._root_dir
+
+    def _location_dir(self, latitude: float, longitude: float) -> str:
+        return os.path.join(self._root_dir, f"{latitude:.4f}_{longitude:.4f}")
+
+    def _latest_issued_at(self, location_dir: str) -> int | None:
+        """
+        issued_at ostatniego zapisu lokalizacji odczytany z dysku (po ponownym uruchomieniu). Ostatni dzień
+        archiwum pokrywa tylko najnowsza prognoza, więc wystarczy przejrzeć jeden plik.
+        """
+        if not os.path.isdir(location_dir):
+            return None
+        day_files = sorted(name for name in os.listdir(location_dir) if name.endswith(".bin"))
+        if not day_files:
+            return None
+        path = os.path.join(location_dir, day_files[-1])
+        count = os.path.getsize(path) // ARCHIVE_DTYPE.itemsize
+        if count == 0:
+            return None
+        return int(np.memmap(path, dtype=ARCHIVE_DTYPE, mode="r", shape=(count,))["issued_at"].max())
+
+    def append(self, latitude: float, longitude: float, forecast: list[WeatherData],
+               issued_at: float | None = None) -> bool:
+        """
+        Dopisuje prognozę do archiwum. Istniejące rekordy nigdy nie są modyfikowane.
+
+        Prognoza pobrana w tym samym oknie przebiegu modelu, co ostatnio zapisana dla tej lokalizacji,
+        jest pomijana (to te same dane modelu). Zwraca True, jeśli prognoza została zapisana.
+        """
+        if not forecast:
+            return False
+        issued_at = int(issued_at if issued_at is not None else time.time())
+
+        records = np.empty(len(forecast), dtype=ARCHIVE_DTYPE)
+        records["time"] = [int(pd.Timestamp(hour.timestamp).timestamp()) for hour in forecast]
+        records["issued_at"] = issued_at
+        records["temperature"] = [hour.temperature for hour in forecast]
+        records["precipitation_probability"] = [hour.precipitation_probability for hour in forecast]
+        records["precipitation_amount"] = [hour.precipitation_amount for hour in forecast]
+        records["sunshine_duration"] = [hour.sunshine_duration for hour in forecast]
+        records["cloud_cover"] = [hour.cloud_cover for hour in forecast]
+
+        location_dir = self._location_dir(latitude, longitude)
+        day_numbers = records["time"] // 86400
+        with self._lock:
+            if location_dir not in self._last_issued_at:
+                self._last_issued_at[location_dir] = self._latest_issued_at(location_dir)
+            last_issued_at = self._last_issued_at[location_dir]
+            if last_issued_at is not None and _model_run_start(last_issued_at) == _model_run_start(issued_at):
+                return False
+            os.makedirs(location_dir, exist_ok=True)
+            for day_number in np.unique(day_numbers):
+                day = datetime.date(1970, 1, 1) + datetime.timedelta(days=int(day_number))
+                with open(os.path.join(location_dir, f"{day.isoformat()}.bin"), "ab") as f:
+                    f.write(records[day_numbers == day_number].tobytes())
+            self._last_issued_at[location_dir] = issued_at
+        return True
+
+    def read_day(self, latitude: float, longitude: float, day: datetime.date) -> np.ndarray | None:
+        """
+        Zwraca godzinowe rekordy danego dnia (najnowsza prognoza dla każdej godziny, posortowane po czasie)
+        albo None, jeśli archiwum nie zawiera tego dnia.
+        """
+        path = os.path.join(self._location_dir(latitude, longitude), f"{day.isoformat()}.bin")
+        if not os.path.exists(path):
+            return None
+        # Rozmiar liczymy sami, aby pominąć ewentualnie niedokończony ostatni rekord
+        count = os.path.getsize(path) // ARCHIVE_DTYPE.itemsize
+        if count == 0:
+            return None
+        records = np.memmap(path, dtype=ARCHIVE_DTYPE, mode="r", shape=(count,))
+
+        order = np.lexsort((records["issued_at"], records["time"]))
+        times = records["time"][order]
+        is_latest = np.append(times[1:] != times[:-1], True)
+        return np.array(records[order[is_latest]])
+
+    def iter_days(self, latitude: float, longitude: float, start: datetime.date,
+                  end: datetime.date) -> Iterator[tuple[datetime.date, np.ndarray]]:
+        """
+        Przechodzi kolejno przez dni z zakresu [start, end] obecne w archiwum, zwracając (dzień, rekordy).
+        """
+        day = start
+        while day <= end:
+            records = self.read_day(latitude, longitude, day)
+            if records is not None:
+                yield day, records
+            day += datetime.timedelta(days=1)
+
+    @staticmethod
+    def records_to_arrays(records: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Zamienia rekordy archiwum na kolumny numpy (format modelu komfortu): zmienne pogodowe zaokrąglone
+        tak jak w records_to_weather_data oraz "hour" i "day" (godzina i numer dnia od 1970-01-01, UTC).
+        """
+        return {
+            "temperature": np.round(records["temperature"].astype(np.float64), 1),
+            "precipitation_probability": np.trunc(records["precipitation_probability"]).astype(np.float64),
+            "precipitation_amount": np.round(records["precipitation_amount"].astype(np.float64), 2),
+            "sunshine_duration": records["sunshine_duration"].astype(np.float64),
+            "cloud_cover": np.trunc(records["cloud_cover"]).astype(np.float64),
+            "hour": records["time"] // 3600 % 24,
+            "day": records["time"] // 86400
+        }
+
+    @staticmethod
+    def records_to_weather_data(records: np.ndarray) -> list[WeatherData]:
+        """Zamienia rekordy archiwum na obiekty WeatherData (np. do obliczenia komfortu)."""
+        return [
+            WeatherData(
+                timestamp=pd.Timestamp(int(record["time"]), unit="s", tz="UTC"),
+                temperature=round(float(record["temperature"]), 1),
+                precipitation_probability=int(record["precipitation_probability"]),
+                precipitation_amount=round(float(record["precipitation_amount"]), 2),
+                sunshine_duration=float(record["sunshine_duration"]),
+                cloud_cover=int(record["cloud_cover"])
+            )
+            for record in records
+        ]
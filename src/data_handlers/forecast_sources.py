@@ -0,0 +1,302 @@
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+
+import flatbuffers
+import niquests
+import numpy as np
+import openmeteo_requests
+import requests
+import requests_cache
+from openmeteo_requests.Client import OpenMeteoRequestsError
+from openmeteo_sdk.Variable import Variable
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
+
+from src.utils.constants import FORECAST_DAYS, WEATHER_CACHE_EXPIRE_SECONDS, WEATHER_MAX_CONNECTIONS
+
+WEATHER_API_URL = "https://api.open-meteo.com/v1/forecast"
+
+# Kolejność zmiennych godzinowych w odpowiedzi - taka sama, jak w parametrze "hourly" zapytania
+HOURLY_VARIABLES = ["temperature_2m", "precipitation_probability", "precipitation", "sunshine_duration",
+                    "cloud_cover"]
+_SDK_VARIABLES = [Variable.temperature, Variable.precipitation_probability, Variable.precipitation,
+                  Variable.sunshine_duration, Variable.cloud_cover]
+
+
+def decode_weather_payload(data: bytes) -> list[WeatherApiResponse]:
+    """
+    Dekoduje surową odpowiedź API w formacie flatbuffers (ciąg komunikatów poprzedzonych 4-bajtową długością).
+    """
+    messages = []
+    pos = 0
+    while pos < len(data):
+        messages.append(WeatherApiResponse.GetRootAs(data, pos + 4))
+        pos += int.from_bytes(data[pos:pos + 4], byteorder="little") + 4
+    return messages
+
+
+def encode_weather_payload(latitude: float, longitude: float, start: int, interval: int,
+                           hourly_values: list[np.ndarray]) -> bytes:
+    """
+    Koduje prognozę godzinową do tego samego formatu flatbuffers, który zwraca API Open-Meteo.
+
+    Args:
+        start (int): Początek prognozy jako znacznik czasu UNIX (sekundy, UTC).
+        interval (int): Odstęp między kolejnymi punktami w sekundach.
+        hourly_values (list[np.ndarray]): Wartości zmiennych w kolejności HOURLY_VARIABLES.
+    """
+    builder = flatbuffers.Builder(1024 + sum(values.size for values in hourly_values) * 4)
+
+    variable_offsets = []
+    for sdk_variable, values in zip(_SDK_VARIABLES, hourly_values):
+        values_vector = builder.CreateNumpyVector(np.asarray(values, dtype=np.float32))
+        builder.StartObject(4)
+        builder.PrependUint8Slot(0, sdk_variable, 0)
+        builder.PrependUOffsetTRelativeSlot(3, values_vector, 0)
+        variable_offsets.append(builder.EndObject())
+
+    builder.StartVector(4, len(variable_offsets), 4)
+    for offset in reversed(variable_offsets):
+        builder.PrependUOffsetTRelative(offset)
+    variables_vector = builder.EndVector()
+
+    length = len(hourly_values[0]) if hourly_values else 0
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + length * interval, 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_vector, 0)
+    hourly = builder.EndObject()
+
+    builder.StartObject(12)
+    builder.PrependFloat32Slot(0, latitude, 0.0)
+    builder.PrependFloat32Slot(1, longitude, 0.0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.FinishSizePrefixed(builder.EndObject())
+    return bytes(builder.Output())
+
+
+def fixture_filename(latitude: float, longitude: float) -> str:
+    """Nazwa pliku z nagraną odpowiedzią dla danej lokalizacji."""
+    return f"{latitude:.4f}_{longitude:.4f}.fb"
+
+
+class ForecastSource(ABC):
+    """
+    Źródło surowych prognoz dla WeatherDataManager.
+
+    Implementacja zwraca listę odpowiedzi WeatherApiResponse dla parametrów zapytania Open-Meteo
+    ("latitude", "longitude", "hourly", ...), dzięki czemu dalsze przetwarzanie jest identyczne
+    niezależnie od tego, czy dane pochodzą z API, z dysku, czy z generatora.
+    """
+
+    # Czy fetch() wysyła zapytanie do zewnętrznego API - tylko takie pobrania zużywają budżet zapytań
+    is_remote = False
+
+    @abstractmethod
+    def fetch(self, params: dict) -> list[WeatherApiResponse]:
+        """Pobiera prognozę synchronicznie. Błędy są zgłaszane wyjątkiem."""
+
+    async def fetch_async(self, params: dict) -> list[WeatherApiResponse]:
+        """Pobiera prognozę asynchronicznie - domyślnie wywołuje fetch() w osobnym wątku."""
+        return await asyncio.to_thread(self.fetch, params)
+
+    async def aclose(self):
+        """Zwalnia zasoby związane z pętlą zdarzeń (np. pulę połączeń)."""
+
+    def is_cached(self, params: dict) -> bool:
+        """Czy fetch() odpowie z własnej pamięci podręcznej, bez zapytania do API."""
+        return False
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """Czy błąd pobrania jest przejściowy, tzn. ponowienie zapytania ma szansę się powieść."""
+        return False
+
+
+class LiveForecastSource(ForecastSource):
+    """
+    Prognozy pobierane z api.open-meteo.com.
+
+    Ścieżka synchroniczna korzysta z pamięci podręcznej HTTP (requests_cache), asynchroniczna ze wspólnej
+    puli połączeń niquests.AsyncSession. Każde wywołanie fetch() to co najwyżej jedno zapytanie do API -
+    ponawianie prób należy do WeatherDataManager, który na każdą próbę pobiera żeton z budżetu zapytań.
+    Jeśli podano record_dir, każda pobrana odpowiedź jest zapisywana na dysk, aby później odtworzyć ją
+    RecordedForecastSource.
+    """
+
+    is_remote = True
+
+    def __init__(self, record_dir: str | None = None):
+        # Konfiguracja klienta Open-Meteo API z pamięcią podręczną (bez ponawiania prób - zob. opis klasy)
+        self._cache_session = requests_cache.CachedSession('.cache', expire_after=WEATHER_CACHE_EXPIRE_SECONDS)
+        self._openmeteo = openmeteo_requests.Client(session=self._cache_session)
+
+        # Klient asynchroniczny tworzony leniwie - sesja jest związana z pętlą zdarzeń, w której powstała
+        self._async_session: niquests.AsyncSession | None = None
+        self._async_session_loop: asyncio.AbstractEventLoop | None = None
+        self._async_openmeteo: openmeteo_requests.AsyncClient | None = None
+
+        self._record_dir = record_dir
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+    def fetch(self, params: dict) -> list[WeatherApiResponse]:
+        responses = self._openmeteo.weather_api(WEATHER_API_URL, params=params)
+        self._record(params, responses)
+        return responses
+
+    def _get_async_client(self) -> openmeteo_requests.AsyncClient:
+        """
+        Zwraca klienta asynchronicznego ze wspólną pulą połączeń dla bieżącej pętli zdarzeń.
+        """
+        loop = asyncio.get_running_loop()
+        if self._async_openmeteo is None or self._async_session_loop is not loop:
+            self._async_session = niquests.AsyncSession(pool_connections=WEATHER_MAX_CONNECTIONS,
+                                                        pool_maxsize=WEATHER_MAX_CONNECTIONS)
+            self._async_session_loop = loop
+            self._async_openmeteo = openmeteo_requests.AsyncClient(session=self._async_session)
+        return self._async_openmeteo
+
+    async def fetch_async(self, params: dict) -> list[WeatherApiResponse]:
+        """Wywołuje API przez wspólną pulę połączeń (bez pamięci podręcznej HTTP)."""
+        responses = await self._get_async_client().weather_api(WEATHER_API_URL, params=params)
+        self._record(params, responses)
+        return responses
+
+    def is_cached(self, params: dict) -> bool:
+        """Czy pamięć podręczna HTTP ścieżki synchronicznej ma ważną odpowiedź na to zapytanie."""
+        # Ten sam klucz, co dla zapytania wysyłanego przez openmeteo_requests.Client (dodaje parametr format)
+        request = self._cache_session.prepare_request(
+            requests.Request("GET", WEATHER_API_URL, params={**params, "format": "flatbuffers"}))
+        response = self._cache_session.cache.get_response(self._cache_session.cache.create_key(request))
+        return response is not None and not response.is_expired
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """
+        Ponawiane są błędy połączenia i odpowiedzi 5xx. Błędy zgłoszone przez samo API (400, 429) nie są
+        ponawiane - kolejne zapytania po 429 tylko pogłębiałyby przekroczenie limitu.
+        """
+        cause = error.__cause__ if isinstance(error, OpenMeteoRequestsError) else error
+        if isinstance(cause, OpenMeteoRequestsError):
+            return False
+        response = getattr(cause, "response", None)
+        if response is not None and getattr(response, "status_code", None) is not None:
+            return response.status_code >= 500
+        return True
+
+    async def aclose(self):
+        if self._async_session is not None:
+            await self._async_session.close()
+        self._async_session = None
+        self._async_session_loop = None
+        self._async_openmeteo = None
+
+    def _record(self, params: dict, responses: list[WeatherApiResponse]):
+        if not self._record_dir or not responses:
+            return
+        # Wszystkie komunikaty jednej odpowiedzi współdzielą bufor z pełną treścią odpowiedzi HTTP
+        payload = bytes(responses[0]._tab.Bytes)
+        path = os.path.join(self._record_dir, fixture_filename(params["latitude"], params["longitude"]))
+        with open(path, "wb") as f:
+            f.write(payload)
+
+
+class RecordedForecastSource(ForecastSource):
+    """
+    Odtwarza odpowiedzi nagrane wcześniej przez LiveForecastSource(record_dir=...).
+
+    Przy align_to_today=True oś czasu prognozy jest przesuwana o pełne dni tak, aby zaczynała się
+    dzisiaj - kalendarz komfortu działa wtedy na nagraniu tak samo, jak na świeżych danych.
+    """
+
+    def __init__(self, fixture_dir: str, latency_seconds: float = 0.0, align_to_today: bool = False):
+        if not os.path.isdir(fixture_dir):
+            raise ValueError(f"Katalog z nagranymi prognozami nie istnieje: {fixture_dir}")
+        self._fixture_dir = fixture_dir
+        self._latency_seconds = latency_seconds
+        self._align_to_today = align_to_today
+        self._payloads: dict[str, bytes] = {}
+
+    def _load_payload(self, params: dict) -> bytes:
+        filename = fixture_filename(params["latitude"], params["longitude"])
+        payload = self._payloads.get(filename)
+        if payload is None:
+            path = os.path.join(self._fixture_dir, filename)
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Brak nagranej prognozy: {path}")
+            with open(path, "rb") as f:
+                payload = f.read()
+            if self._align_to_today:
+                payload = self._shift_to_today(payload)
+            self._payloads[filename] = payload
+        return payload
+
+    @staticmethod
+    def _shift_to_today(payload: bytes) -> bytes:
+        response = decode_weather_payload(payload)[0]
+        hourly = response.Hourly()
+        today_start = int(time.time()) // 86400 * 86400
+        shift_days = (today_start - hourly.Time()) // 86400
+        values = [hourly.Variables(i).ValuesAsNumpy() for i in range(hourly.VariablesLength())]
+        return encode_weather_payload(response.Latitude(), response.Longitude(),
+                                      hourly.Time() + shift_days * 86400, hourly.Interval(), values)
+
+    def fetch(self, params: dict) -> list[WeatherApiResponse]:
+        if self._latency_seconds:
+            time.sleep(self._latency_seconds)
+        return decode_weather_payload(self._load_payload(params))
+
+    async def fetch_async(self, params: dict) -> list[WeatherApiResponse]:
+        if self._latency_seconds:
+            await asyncio.sleep(self._latency_seconds)
+        return decode_weather_payload(self._load_payload(params))
+
+
+class SyntheticForecastSource(ForecastSource):
+    """
+    Generuje deterministyczne prognozy o zadanej długości i opóźnieniu - do testów wydajności bez sieci.
+
+    Te same (seed, szerokość, długość) dają zawsze te same wartości. Prognoza zaczyna się o północy
+    (UTC) bieżącego dnia, chyba że podano start_timestamp.
+    """
+
+    def __init__(self, hours: int = FORECAST_DAYS * 24, latency_seconds: float = 0.0, seed: int = 0,
+                 start_timestamp: int | None = None):
+        if not isinstance(hours, int) or hours <= 0:
+            raise ValueError("Liczba godzin prognozy musi być dodatnią liczbą całkowitą.")
+        self._hours = hours
+        self._latency_seconds = latency_seconds
+        self._seed = seed
+        self._start_timestamp = start_timestamp
+
+    def _generate_payload(self, params: dict) -> bytes:
+        latitude, longitude = params["latitude"], params["longitude"]
+        rng = np.random.default_rng([self._seed, int(round(latitude * 1e4)) % 2**32,
+                                     int(round(longitude * 1e4)) % 2**32])
+        start = self._start_timestamp
+        if start is None:
+            start = int(time.time()) // 86400 * 86400
+
+        hour_of_day = (np.arange(self._hours) + start // 3600) % 24
+        daily_cycle = -np.cos(2 * np.pi * (hour_of_day - 3) / 24)
+        temperature = 12 + 7 * daily_cycle + rng.normal(0, 2, self._hours)
+        precipitation_probability = np.clip(rng.normal(30, 25, self._hours), 0, 100).round()
+        precipitation = np.where(rng.random(self._hours) * 100 < precipitation_probability,
+                                 rng.exponential(0.8, self._hours), 0.0)
+        cloud_cover = np.clip(rng.normal(55, 30, self._hours), 0, 100).round()
+        sunshine_duration = np.where(daily_cycle > -0.3, 3600 * (1 - cloud_cover / 100), 0.0)
+
+        return encode_weather_payload(latitude, longitude, start, 3600,
+                                      [temperature, precipitation_probability, precipitation,
+                                       sunshine_duration, cloud_cover])
+
+    def fetch(self, params: dict) -> list[WeatherApiResponse]:
+        if self._latency_seconds:
+            time.sleep(self._latency_seconds)
+        return decode_weather_payload(self._generate_payload(params))
+
+    async def fetch_async(self, params: dict) -> list[WeatherApiResponse]:
+        if self._latency_seconds:
+            await asyncio.sleep(self._latency_seconds)
+        return decode_weather_payload(self._generate_payload(params))
@@ -0,0 +1,128 @@
+import asyncio
+import threading
+import time
+from typing import Callable
+
+from src.utils.constants import WEATHER_RATE_LIMITS, WEATHER_BACKGROUND_RESERVE
+
+# Priorytety zapytań do API: zapytania użytkownika mają pierwszeństwo przed odświeżaniem w tle
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BACKGROUND = "background"
+
+
+class TokenBucket:
+    """
+    Wiadro żetonów: pojemność capacity, uzupełniane równomiernie o capacity żetonów na period_seconds.
+    Nie jest bezpieczne wątkowo - synchronizację zapewnia RequestBudget.
+    """
+
+    def __init__(self, capacity: int, period_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.capacity = capacity
+        self._refill_per_second = capacity / period_seconds
+        self._clock = clock
+        self._tokens = float(capacity)
+        self._updated_at = clock()
+
+    @property
+    def tokens(self) -> float:
+        self._refill()
+        return self._tokens
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._refill_per_second)
+        self._updated_at = now
+
+    def seconds_until(self, tokens: float) -> float:
+        """Czas oczekiwania, po którym w wiadrze będzie co najmniej tokens żetonów."""
+        missing = tokens - self.tokens
+        return max(0.0, missing / self._refill_per_second)
+
+    def take(self, tokens: float = 1.0):
+        self._refill()
+        self._tokens -= tokens
+
+
+class RequestBudget:
+    """
+    Budżet zapytań do zewnętrznego API z kilkoma limitami jednocześnie (np. na minutę, godzinę i dzień).
+
+    Zapytanie jest dozwolone, jeśli mieści się we wszystkich limitach. Zapytania w tle (PRIORITY_BACKGROUND)
+    nie mogą zejść poniżej rezerwy background_reserve każdego limitu - ta część jest zostawiona dla zapytań
+    użytkownika, więc intensywne odświeżanie w tle nie blokuje interfejsu. Liczniki przyznanych
+    i odrzuconych zapytań są dostępne przez usage().
+    """
+
+    def __init__(self, limits: dict[str, tuple[int, float]] = WEATHER_RATE_LIMITS,
+                 background_reserve: float = WEATHER_BACKGROUND_RESERVE, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            limits (dict): Nazwa limitu -> (liczba zapytań, okres w sekundach).
+            background_reserve (float): Część (0-1) każdego limitu niedostępna dla zapytań w tle.
+        """
+        if not 0 <= background_reserve < 1:
+            raise ValueError("Rezerwa dla zapytań interaktywnych musi być liczbą z przedziału [0, 1).")
+        self._buckets = {name: TokenBucket(capacity, period, clock) for name, (capacity, period) in limits.items()}
+        self._background_reserve = background_reserve
+        self._lock = threading.Lock()
+        self._granted = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+        self._denied = {PRIORITY_INTERACTIVE: 0, PRIORITY_BACKGROUND: 0}
+
+    def _required_tokens(self, bucket: TokenBucket, priority: str) -> float:
+        """Ile żetonów musi być w wiadrze, aby zapytanie o danym priorytecie mogło z niego skorzystać."""
+        if priority == PRIORITY_BACKGROUND:
+            return 1.0 + bucket.capacity * self._background_reserve
+        return 1.0
+
+    def _seconds_until_allowed(self, priority: str) -> float:
+        return max((bucket.seconds_until(self._required_tokens(bucket, priority))
+                    for bucket in self._buckets.values()), default=0.0)
+
+    def _try_take(self, priority: str, deadline: float) -> tuple[bool | None, float]:
+        """Zwraca (True, 0) po pobraniu żetonu, (False, 0) przy odrzuceniu lub (None, czas oczekiwania)."""
+        with self._lock:
+            wait = self._seconds_until_allowed(priority)
+            if wait == 0:
+                for bucket in self._buckets.values():
+                    bucket.take()
+                self._granted[priority] += 1
+                return True, 0.0
+            if time.monotonic() + wait > deadline:
+                self._denied[priority] += 1
+                return False, 0.0
+            return None, wait
+
+    def try_acquire(self, priority: str = PRIORITY_INTERACTIVE) -> bool:
+        """Pobiera żeton z każdego limitu, jeśli zapytanie się w nich mieści. Nie czeka."""
+        return self.acquire(priority, max_wait_seconds=0.0)
+
+    def acquire(self, priority: str = PRIORITY_INTERACTIVE, max_wait_seconds: float = 0.0) -> bool:
+        """
+        Jak try_acquire, ale jeśli żeton będzie dostępny w ciągu max_wait_seconds, czeka na niego.
+        Zapytania, które musiałyby czekać dłużej, są odrzucane od razu - czas odpowiedzi pozostaje przewidywalny.
+        """
+        deadline = time.monotonic() + max_wait_seconds
+        while True:
+            granted, wait = self._try_take(priority, deadline)
+            if granted is not None:
+                return granted
+            time.sleep(wait)
+
+    async def acquire_async(self, priority: str = PRIORITY_INTERACTIVE, max_wait_seconds: float = 0.0) -> bool:
+        """Asynchroniczny odpowiednik acquire - czekanie nie blokuje pętli zdarzeń."""
+        deadline = time.monotonic() + max_wait_seconds
+        while True:
+            granted, wait = self._try_take(priority, deadline)
+            if granted is not None:
+                return granted
+            await asyncio.sleep(wait)
+
+    def usage(self) -> dict:
+        """Stan budżetu: dostępne żetony każdego limitu oraz liczniki przyznanych i odrzuconych zapytań."""
+        with self._lock:
+            return {
+                "limits": {name: {"capacity": bucket.capacity, "available": round(bucket.tokens, 2)}
+                           for name, bucket in self._buckets.items()},
+                "granted": dict(self._granted),
+                "denied": dict(self._denied),
+            }
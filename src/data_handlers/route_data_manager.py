@@ -1,25 +1,66 @@
+import threading
+from collections import Counter
+from typing import Callable
+
+import numpy as np
 import pandas as pd
+from src.data_handlers.route_features import RouteFeatures
+from src.data_handlers.spatial_index import haversine_km
 from src.models.route import Route
 from src.models.user_preference import UserPreference
-from src.utils.constants import DIFFICULTY_MULTIPLIERS, TIME_RANGES
+from src.utils.constants import DIFFICULTY_MULTIPLIERS, TIME_RANGES, CATALOGUE_WATCH_INTERVAL_SECONDS
 import os
 
 
 class RouteDataManager:
     def __init__(self, trails_csv_path: str):
-        self._routes: list[Route] = []
         self._trails_csv_path = trails_csv_path
-        self._load_routes_from_csv()
-        print(f"Loaded {len(self._routes)} routes from CSV.")
+        routes = self._load_routes_from_csv() or []
+        # Trasy i ich cechy tablicowe podmieniane razem jednym przypisaniem - zob. snapshot()
+        self._catalogue: tuple[list[Route], RouteFeatures] = (routes, RouteFeatures(routes))
+        self._positions_by_id = {route.id: position for position, route in enumerate(routes)}
+        self._next_id = max(self._positions_by_id, default=0) + 1
+        # Zwiększany przy każdej zmianie katalogu tras - pozwala unieważniać wyniki zależne od tras
+        self._catalogue_version = 1
+
+        self._reload_lock = threading.Lock()
+        self._change_listeners: list[Callable[[dict], None]] = []
+        self._watch_thread: threading.Thread | None = None
+        self._watch_stop = threading.Event()
+        self._csv_stamp = self._file_stamp()
+        print(f"Loaded {len(routes)} routes from CSV.")
 
     @property
     def routes(self) -> list[Route]:
-        return self._routes
+        return self._catalogue[0]
+
+    @property
+    def catalogue_version(self) -> int:
+        return self._catalogue_version
+
+    @property
+    def features(self) -> RouteFeatures:
+        """Tablicowe cechy tras, wiersz i odpowiada routes[i]."""
+        return self._catalogue[1]
 
-    def _load_routes_from_csv(self):
+    def snapshot(self) -> tuple[list[Route], RouteFeatures]:
+        """
+        Zwraca spójną parę (trasy, cechy) z jednej wersji katalogu. Kod wykonujący kilka kroków na katalogu
+        powinien korzystać z niej zamiast osobno z routes i features, które mogą zmienić się pomiędzy odczytami.
+        """
+        return self._catalogue
+
+    def _load_routes_from_csv(self) -> list[Route] | None:
+        """
+        Wczytuje trasy z pliku CSV. Identyfikatory to numery wierszy (od 1).
+        Zwraca None, jeśli pliku nie da się wczytać albo nie zawiera żadnej poprawnej trasy (np. jest pusty
+        lub obcięty w trakcie zapisu) - reload() zachowuje wtedy dotychczasowy katalog.
+        """
         if not os.path.exists(self._trails_csv_path):
             print(f"Błąd: Plik CSV '{self._trails_csv_path}' nie został znaleziony.")
-            return
+            return None
+
+        routes: list[Route] = []
 
         try:
             df = pd.read_csv(self._trails_csv_path, sep=';', encoding='utf-16')
@@ -41,11 +82,11 @@ class RouteDataManager:
                 missing = [col for col in required_cols_after_mapping if col not in df.columns]
                 print(f"Błąd: Po mapowaniu brak wymaganych kolumn w pliku CSV: {missing}.")
                 print(f"Columns after attempted mapping: {df.columns.tolist()}")
-                return
+                return None
 
             if df.empty:
-                print(f"Ostrzeżenie: Plik '{self._trails_csv_path}' jest pusty.")
-                return
+                print(f"Błąd: Plik '{self._trails_csv_path}' jest pusty.")
+                return None
 
             for index, row in df.iterrows():
                 try:
@@ -58,21 +99,178 @@ class RouteDataManager:
                     _rating = 0.0 if _rating_str.lower() == 'brak ocen' else float(_rating_str)
                     _link = str(row['link'])
                     _image_link = str(row['image_link'])
+                    # Czas podany w pliku jest opcjonalny - brakująca kolumna lub wartość to None
+                    _listed_minutes = row.get('Estimated_Time_In_Minutes')
+                    _listed_minutes = float(_listed_minutes) if pd.notna(_listed_minutes) else None
+                    # Współrzędne również są opcjonalne - bez nich trasa dostaje środek swojego miasta
+                    _latitude, _longitude = row.get('Latitude'), row.get('Longitude')
+                    if pd.notna(_latitude) and pd.notna(_longitude):
+                        _latitude = float(str(_latitude).replace(',', '.'))
+                        _longitude = float(str(_longitude).replace(',', '.'))
+                    else:
+                        _latitude, _longitude = None, None
 
                     route = Route(
                         id=_id, name=_name, region=_region, length_km=_length_km,
-                        difficulty=_difficulty, rating=_rating, link=_link, image_link=_image_link
+                        difficulty=_difficulty, rating=_rating, link=_link, image_link=_image_link,
+                        listed_time_minutes=_listed_minutes, latitude=_latitude, longitude=_longitude
                     )
-                    self._routes.append(route)
+                    routes.append(route)
                 except ValueError as e:
                     print(f"Błąd konwersji danych w wierszu {index + 1}: {e}. Wiersz: {row.to_dict()}")
                 except KeyError as e:
                     print(f"Błąd klucza w wierszu {index + 1}: {e}. Sprawdź mapowanie. Wiersz: {row.to_dict()}")
         except pd.errors.EmptyDataError:
             print(f"Błąd: Plik '{self._trails_csv_path}' jest pusty.")
+            return None
         except Exception as e:
             print(f"Nieoczekiwany błąd podczas ładowania tras z '{self._trails_csv_path}': {e}")
+            return None
+        if not routes:
+            print(f"Błąd: Plik '{self._trails_csv_path}' nie zawiera żadnej poprawnej trasy.")
+            return None
+        return routes
+
+    @staticmethod
+    def _route_keys(routes: list[Route]) -> list[tuple]:
+        """
+        Klucze tras do porównywania wersji katalogu: (link, region, numer wystąpienia).
+        Ten sam link może występować w kilku miastach, a nawet kilka razy w jednym mieście.
+        """
+        occurrences = Counter()
+        keys = []
+        for route in routes:
+            base_key = (route.link, route.region.lower())
+            keys.append(base_key + (occurrences[base_key],))
+            occurrences[base_key] += 1
+        return keys
+
+    @staticmethod
+    def _route_content(route: Route) -> tuple:
+        return (route.name, route.region, route.length_km, route.difficulty, route.rating, route.link,
+                route.image_link, route.listed_time_hours, route.has_coordinates, route.coordinates['latitude'],
+                route.coordinates['longitude'])
+
+    @staticmethod
+    def _with_id(route: Route, route_id: int) -> Route:
+        listed_minutes = route.listed_time_hours * 60 if route.listed_time_hours is not None else None
+        latitude, longitude = None, None
+        if route.has_coordinates:
+            latitude, longitude = route.coordinates['latitude'], route.coordinates['longitude']
+        return Route(id=route_id, name=route.name, region=route.region, length_km=route.length_km,
+                     difficulty=route.difficulty, rating=route.rating, link=route.link,
+                     image_link=route.image_link, listed_time_minutes=listed_minutes,
+                     latitude=latitude, longitude=longitude)
+
+    def add_change_listener(self, listener: Callable[[dict], None]):
+        """
+        Rejestruje funkcję wywoływaną po każdej zmianie katalogu. Otrzymuje słownik:
+        {"inserted": [Route], "updated": [(stara Route, nowa Route)], "deleted": [Route]}.
+        """
+        self._change_listeners.append(listener)
+
+    def reload(self) -> dict:
+        """
+        Wczytuje ponownie plik CSV i nanosi na katalog tylko różnice (nowe, zmienione i usunięte trasy).
 
+        Katalog ma zawsze kolejność pliku CSV (od niej zależy m.in. to, która z tras o tej samej nazwie zostaje
+        w wynikach). Trasy rozpoznane po kluczu zachowują swoje id, nowe dostają kolejne wolne id. Cechy
+        tablicowe niezmienionych tras są kopiowane, a nie liczone od nowa; trasy, cechy i mapa id są podmieniane
+        w całości, więc równoległe zapytania widzą spójne dane. Trasy, których kolejność względem innych się
+        zmieniła, są zgłaszane słuchaczom jako zmienione.
+        Zwraca liczbę wstawionych, zmienionych i usuniętych tras.
+        """
+        with self._reload_lock:
+            self._csv_stamp = self._file_stamp()
+            new_routes = self._load_routes_from_csv()
+            if new_routes is None:
+                print("Nie udało się wczytać pliku z trasami - katalog pozostaje bez zmian.")
+                return {"inserted": 0, "updated": 0, "deleted": 0}
+
+            old_routes, old_features = self._catalogue
+            old_positions = dict(zip(self._route_keys(old_routes), range(len(old_routes))))
+            routes, source_rows, updated_pairs, inserted = [], [], [], []
+            # Największa dotychczasowa pozycja zachowanej trasy - trasa o mniejszej pozycji zmieniła kolejność
+            latest_position = -1
+            for key, new_route in zip(self._route_keys(new_routes), new_routes):
+                position = old_positions.pop(key, None)
+                if position is None:
+                    route = self._with_id(new_route, self._next_id)
+                    self._next_id += 1
+                    inserted.append(route)
+                    routes.append(route)
+                    source_rows.append(-1)
+                    continue
+                old_route = old_routes[position]
+                if self._route_content(old_route) != self._route_content(new_route):
+                    route = self._with_id(new_route, old_route.id)
+                    updated_pairs.append((old_route, route))
+                    source_rows.append(-1)
+                else:
+                    route = old_route
+                    if position < latest_position:
+                        updated_pairs.append((old_route, route))
+                    source_rows.append(position)
+                latest_position = max(latest_position, position)
+                routes.append(route)
+            deleted_positions = sorted(old_positions.values())
+
+            if updated_pairs or inserted or deleted_positions:
+                features = old_features.with_rows(source_rows, routes)
+                deleted = [old_routes[position] for position in deleted_positions]
+                self._catalogue = (routes, features)
+                self._positions_by_id = {route.id: position for position, route in enumerate(routes)}
+                self._catalogue_version += 1
+
+                changes = {"inserted": inserted, "updated": updated_pairs, "deleted": deleted}
+                for listener in self._change_listeners:
+                    listener(changes)
+
+            summary = {"inserted": len(inserted), "updated": len(updated_pairs), "deleted": len(deleted_positions)}
+            print(f"Reloaded routes from CSV: {summary}.")
+            return summary
+
+    def _file_stamp(self) -> tuple | None:
+        try:
+            stat = os.stat(self._trails_csv_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start_watching(self, interval_seconds: float = CATALOGUE_WATCH_INTERVAL_SECONDS):
+        """
+        Uruchamia w tle sprawdzanie pliku CSV i wywołuje reload() po każdej jego zmianie. Zmieniony plik jest
+        wczytywany dopiero, gdy jego czas modyfikacji i rozmiar są takie same w dwóch kolejnych sprawdzeniach.
+        """
+        if self._watch_thread is not None and self._watch_thread.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watch_thread = threading.Thread(target=self._watch_loop, args=(interval_seconds,),
+                                              name="trails-csv-watcher", daemon=True)
+        self._watch_thread.start()
+
+    def stop_watching(self, timeout: float | None = 5.0):
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout)
+        self._watch_thread = None
+
+    def _watch_loop(self, interval_seconds: float):
+        pending_stamp = None
+        while not self._watch_stop.wait(interval_seconds):
+            stamp = self._file_stamp()
+            if stamp is None or stamp == self._csv_stamp:
+                pending_stamp = None
+                continue
+            if stamp != pending_stamp:
+                # Plik mógł być jeszcze zapisywany - wczytujemy go, gdy nie zmieni się do kolejnego sprawdzenia
+                pending_stamp = stamp
+                continue
+            pending_stamp = None
+            try:
+                self.reload()
+            except Exception as e:
+                print(f"Błąd podczas przeładowania pliku z trasami: {e}")
 
     def check_route_match_preferences(self, route: Route, user_preferences: UserPreference) -> bool:
         """
@@ -100,8 +298,8 @@ class RouteDataManager:
         preferred_time_range_values = TIME_RANGES.get(user_preferences.preferred_time_range)
         if preferred_time_range_values:
             min_time, max_time = preferred_time_range_values
-            # .estimated_time_hours (obliczone)
-            if not (min_time <= route.estimated_time_hours <= max_time):
+            # .estimated_time_hours (obliczone, z uwzględnieniem prędkości marszu użytkownika)
+            if not (min_time <= route.estimated_time_for_speed(user_preferences.walking_speed_kmh) <= max_time):
                 return False
 
         # region
@@ -109,18 +307,56 @@ class RouteDataManager:
             if route.region.lower() != user_preferences.preferred_city.lower():
                 return False
 
+        # odległość od użytkownika
+        if user_preferences.has_location_filter:
+            distance = haversine_km(user_preferences.latitude, user_preferences.longitude,
+                                    np.array([route.coordinates['latitude']]),
+                                    np.array([route.coordinates['longitude']]))[0]
+            if distance > user_preferences.max_distance_km:
+                return False
+
         return True
 
+    def match_mask(self, user_preferences: UserPreference) -> np.ndarray:
+        """
+        Zwraca maskę logiczną (wiersz i odpowiada routes[i]) tras pasujących do preferencji,
+        wyznaczoną jedną serią operacji tablicowych.
+        """
+        return self.features.match_mask(user_preferences)
+
     def filter_routes(self, user_preferences: UserPreference) -> list[Route]:
-        filtered_routes = []
-        for route_item in self._routes:
-            if self.check_route_match_preferences(route_item, user_preferences):
-                filtered_routes.append(route_item)
+        routes, features = self._catalogue
+        mask = features.match_mask(user_preferences)
+        filtered_routes = [routes[i] for i in np.flatnonzero(mask)]
         print(f"Filtered down to {len(filtered_routes)} routes based on user preferences.")
         return filtered_routes
 
+    def find_routes_near(self, latitude: float, longitude: float, radius_km: float | None = None,
+                         k: int | None = None,
+                         user_preferences: UserPreference | None = None) -> list[tuple[Route, float]]:
+        """
+        Zwraca trasy najbliższe podanemu punktowi jako listę (trasa, odległość w km), od najbliższej.
+
+        radius_km ogranicza wynik do tras w promieniu, k - do k najbliższych (można podać oba).
+        Jeśli podano user_preferences, brane są pod uwagę tylko trasy spełniające pozostałe preferencje.
+        Trasy bez własnych współrzędnych są umieszczane w środku swojego miasta.
+        """
+        if radius_km is None and k is None:
+            raise ValueError("Należy podać promień wyszukiwania lub liczbę najbliższych tras.")
+        if k is not None and (not isinstance(k, int) or k <= 0):
+            raise ValueError("Liczba najbliższych tras musi być dodatnią liczbą całkowitą.")
+
+        routes, features = self._catalogue
+        candidate_mask = features.match_mask(user_preferences) if user_preferences is not None else None
+        if k is None:
+            rows, distances = features.spatial_index.within_radius(latitude, longitude, radius_km, candidate_mask)
+        else:
+            rows, distances = features.spatial_index.nearest(latitude, longitude, k, candidate_mask, radius_km)
+        return [(routes[row], float(distance)) for row, distance in zip(rows, distances)]
+
     def get_route_by_id(self, route_id: int) -> Route | None:
-        for route in self._routes:
-            if route.id == route_id:
-                return route
-        return None
\ No newline at end of file
+        routes, positions_by_id = self._catalogue[0], self._positions_by_id
+        position = positions_by_id.get(route_id)
+        if position is None or position >= len(routes) or routes[position].id != route_id:
+            return None
+        return routes[position]
\ No newline at end of file
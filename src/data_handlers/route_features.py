@@ -0,0 +1,187 @@
+import copy
+
+import numpy as np
+
+from src.data_handlers.spatial_index import GridSpatialIndex, haversine_km
+from src.models.route import Route
+from src.models.user_preference import UserPreference
+from src.utils import constants
+
+
+class RouteFeatures:
+    """
+    Kolumnowa (tablicowa) reprezentacja cech tras używanych przy filtrowaniu.
+
+    Wiersz i odpowiada trasie routes[i] z RouteDataManager. Szacowany czas przejścia zależy od stałych
+    BASE_WALKING_SPEED_KMH i DIFFICULTY_MULTIPLIERS - jeśli stałe zmienią się w trakcie działania programu,
+    wektor czasu zostanie przeliczony przy następnym użyciu. Współrzędne tras (Route.coordinates) są dodatkowo
+    indeksowane przestrzennie na potrzeby zapytań o trasy w pobliżu.
+    """
+
+    # Kolumny przechowywane bezpośrednio; pozostałe wektory są z nich wyliczane
+    _COLUMNS = ('length_km', 'rating', 'difficulty_rank', 'listed_time_hours', 'region_code', 'latitude',
+                'longitude')
+
+    def __init__(self, routes: list[Route]):
+        self._difficulty_order = list(constants.DIFFICULTY_MULTIPLIERS.keys())
+        # Region zakodowany jako indeks w słowniku znormalizowanych (małe litery) nazw
+        self._region_codes: dict[str, int] = {}
+        for name, values in self._columns_for(routes).items():
+            setattr(self, name, values)
+        self._reset_derived()
+
+    def _columns_for(self, routes: list[Route]) -> dict[str, np.ndarray]:
+        """Buduje kolumny dla podanych tras, dopisując nowe regiony do słownika kodów."""
+        for route in routes:
+            self._region_codes.setdefault(route.region.lower(), len(self._region_codes))
+        return {
+            'length_km': np.array([route.length_km for route in routes], dtype=np.float64),
+            'rating': np.array([route.rating for route in routes], dtype=np.float64),
+            'difficulty_rank': np.array([self._difficulty_order.index(route.difficulty) for route in routes],
+                                        dtype=np.int8),
+            'listed_time_hours': np.array(
+                [route.listed_time_hours if route.listed_time_hours is not None else np.nan for route in routes],
+                dtype=np.float64),
+            'region_code': np.array([self._region_codes[route.region.lower()] for route in routes], dtype=np.int32),
+            'latitude': np.array([route.coordinates['latitude'] for route in routes], dtype=np.float64),
+            'longitude': np.array([route.coordinates['longitude'] for route in routes], dtype=np.float64),
+        }
+
+    def _reset_derived(self):
+        self._constants_signature = None
+        self._difficulty_multiplier = None
+        self._estimated_time_hours = None
+        self._spatial_index = None
+
+    @property
+    def region_names(self) -> list[str]:
+        return list(self._region_codes)
+
+    def with_rows(self, source_rows: list[int], routes: list[Route]) -> 'RouteFeatures':
+        """
+        Zwraca nowy obiekt dla tras routes (nowa wersja katalogu), bez przeliczania niezmienionych tras.
+
+        Wiersz j jest kopiowany z wiersza source_rows[j] bieżącego obiektu, a wiersze z source_rows[j] == -1
+        (trasy nowe lub zmienione) są wyliczane z routes[j]. Bieżący obiekt pozostaje bez zmian, więc trwające
+        zapytania nadal widzą spójne dane.
+        """
+        changed = copy.copy(self)
+        changed._region_codes = dict(self._region_codes)
+        source_rows = np.asarray(source_rows, dtype=np.int64)
+        kept = source_rows >= 0
+        fresh_rows = np.flatnonzero(~kept)
+        fresh_columns = changed._columns_for([routes[row] for row in fresh_rows])
+        for name in self._COLUMNS:
+            current = getattr(self, name)
+            values = np.empty(len(routes), dtype=current.dtype)
+            values[kept] = current[source_rows[kept]]
+            values[fresh_rows] = fresh_columns[name]
+            setattr(changed, name, values)
+        changed._reset_derived()
+        return changed
+
+    @property
+    def spatial_index(self) -> GridSpatialIndex:
+        """Indeks przestrzenny współrzędnych tras, budowany przy pierwszym użyciu."""
+        if self._spatial_index is None:
+            self._spatial_index = GridSpatialIndex(self.latitude, self.longitude)
+        return self._spatial_index
+
+    def __len__(self) -> int:
+        return len(self.length_km)
+
+    @staticmethod
+    def _current_constants_signature() -> tuple:
+        return constants.BASE_WALKING_SPEED_KMH, tuple(constants.DIFFICULTY_MULTIPLIERS.items())
+
+    def _refresh_if_constants_changed(self):
+        signature = self._current_constants_signature()
+        if signature == self._constants_signature:
+            return
+        multipliers = np.array([constants.DIFFICULTY_MULTIPLIERS.get(name, 1.0) for name in self._difficulty_order],
+                               dtype=np.float64)
+        self._difficulty_multiplier = multipliers[self.difficulty_rank]
+        self._estimated_time_hours = self.length_km * self._difficulty_multiplier / constants.BASE_WALKING_SPEED_KMH
+        self._constants_signature = signature
+
+    def estimated_time_hours(self, walking_speed_kmh: float | None = None, rows: slice = slice(None)) -> np.ndarray:
+        """
+        Zwraca wektor szacowanych czasów przejścia (w godzinach) dla wierszy rows (domyślnie wszystkich).
+
+        Dla prędkości innej niż BASE_WALKING_SPEED_KMH wektor jest liczony jedną operacją tablicową,
+        bez tworzenia obiektów Route na nowo.
+        """
+        self._refresh_if_constants_changed()
+        if walking_speed_kmh is None or walking_speed_kmh == constants.BASE_WALKING_SPEED_KMH:
+            return self._estimated_time_hours[rows]
+        return self.length_km[rows] * self._difficulty_multiplier[rows] / walking_speed_kmh
+
+    def match_mask(self, preferences: UserPreference, rows: slice = slice(None)) -> np.ndarray:
+        """
+        Zwraca maskę logiczną tras spełniających preferencje - odpowiednik
+        RouteDataManager.check_route_match_preferences dla wszystkich tras naraz
+        (lub tylko dla wierszy rows, np. przy przetwarzaniu katalogu porcjami).
+        """
+        length_km = self.length_km[rows]
+        mask = self.difficulty_rank[rows] <= self._difficulty_order.index(preferences.preferred_difficulty)
+        mask &= (length_km >= preferences.min_length) & (length_km <= preferences.max_length)
+        mask &= self.rating[rows] >= preferences.min_rating
+
+        preferred_time_range_values = constants.TIME_RANGES.get(preferences.preferred_time_range)
+        if preferred_time_range_values:
+            min_time, max_time = preferred_time_range_values
+            estimated_time = self.estimated_time_hours(preferences.walking_speed_kmh, rows)
+            mask &= (estimated_time >= min_time) & (estimated_time <= max_time)
+
+        if preferences.preferred_city != "Trójmiasto":  # "Trójmiasto" oznacza brak filtra miasta
+            region_code = self._region_codes.get(preferences.preferred_city.lower())
+            if region_code is None:
+                return np.zeros(len(length_km), dtype=bool)
+            mask &= self.region_code[rows] == region_code
+
+        if preferences.has_location_filter:
+            if rows == slice(None):
+                nearby_rows, _ = self.spatial_index.within_radius(preferences.latitude, preferences.longitude,
+                                                                  preferences.max_distance_km)
+                nearby = np.zeros(len(self), dtype=bool)
+                nearby[nearby_rows] = True
+            else:
+                # Porcja katalogu - odległości tylko dla jej wierszy, bez zapytania o cały katalog przy każdej
+                # porcji. Każdy wiersz ma współrzędne - trasy bez własnych dostają środek miasta lub Trójmiasta
+                # (Route.coordinates), więc o ich dopasowaniu decyduje odległość tego środka
+                distances = haversine_km(preferences.latitude, preferences.longitude, self.latitude[rows],
+                                         self.longitude[rows])
+                nearby = distances <= preferences.max_distance_km
+            mask &= nearby
+
+        return mask
+
+    def static_scores(self, preferences: UserPreference, rows: np.ndarray) -> tuple[np.ndarray, float]:
+        """
+        Zwraca część oceny trasy niezależną od pogody dla podanych wierszy oraz udział wagi pogody.
+
+        Pełna ocena (0-1) to static + weather_share * czynnik_pogodowy, gdzie czynnik pogodowy to średni
+        komfort z kalendarza podzielony przez 100. Czynniki: zgodność trudności z preferowaną, bliskość długości
+        do środka preferowanego zakresu oraz ocena trasy, ważone wagami z UserPreference.get_weights().
+        """
+        weights = preferences.get_weights()
+        total_weight = sum(weights.values())
+        if total_weight == 0:
+            return np.zeros(len(rows)), 0.0
+
+        preferred_rank = self._difficulty_order.index(preferences.preferred_difficulty)
+        difficulty_distance = np.abs(self.difficulty_rank[rows].astype(np.int64) - preferred_rank)
+        difficulty_factor = 1 - difficulty_distance / max(1, len(self._difficulty_order) - 1)
+
+        half_range = (preferences.max_length - preferences.min_length) / 2
+        if half_range > 0:
+            middle = preferences.min_length + half_range
+            length_factor = np.maximum(0.0, 1 - np.abs(self.length_km[rows] - middle) / half_range)
+        else:
+            length_factor = np.ones(len(rows))
+
+        rating_factor = self.rating[rows] / constants.MAX_RATING
+
+        static = (weights['difficulty'] * difficulty_factor + weights['length'] * length_factor +
+                  weights['rating'] * rating_factor) / total_weight
+        return static, weights['weather'] / total_weight
@@ -0,0 +1,168 @@
+import math
+
+import numpy as np
+
+from src.utils.constants import SPATIAL_INDEX_CELL_DEGREES
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(latitude: float, longitude: float, latitudes: np.ndarray, longitudes: np.ndarray) -> np.ndarray:
+    """Odległości (w km, po wielkim kole) od punktu do każdego z punktów tablic latitudes/longitudes."""
+    lat1 = math.radians(latitude)
+    lat2 = np.radians(latitudes)
+    half_dlat = (lat2 - lat1) / 2
+    half_dlon = np.radians(longitudes - longitude) / 2
+    a = np.sin(half_dlat) ** 2 + math.cos(lat1) * np.cos(lat2) * np.sin(half_dlon) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class GridSpatialIndex:
+    """
+    Indeks przestrzenny punktów (szerokość, długość geograficzna) oparty na siatce kubełków.
+
+    Każdy punkt trafia do komórki o boku cell_degrees stopni (podobnie jak prefiks geohasha). Zapytanie
+    o promień przegląda tylko komórki przecinające obszar wokół punktu, a zapytanie o k najbliższych
+    przegląda komórki pierścieniami od środka, aż dalsze pierścienie nie mogą już zawierać bliższych punktów.
+    Dokładne odległości liczone są wektorowo tylko dla kandydatów z odwiedzonych komórek.
+
+    Zakłada katalog regionalny - obszary przecinające południk 180° lub bieguny są obsługiwane
+    przeglądem wszystkich punktów.
+    """
+
+    def __init__(self, latitudes: np.ndarray, longitudes: np.ndarray, cell_degrees: float = SPATIAL_INDEX_CELL_DEGREES):
+        self._latitudes = np.asarray(latitudes, dtype=np.float64)
+        self._longitudes = np.asarray(longitudes, dtype=np.float64)
+        self._cell_degrees = cell_degrees
+
+        rows = np.flatnonzero(np.isfinite(self._latitudes) & np.isfinite(self._longitudes))
+        self._indexed_rows = rows
+        cell_y = np.floor(self._latitudes[rows] / cell_degrees).astype(np.int64)
+        cell_x = np.floor(self._longitudes[rows] / cell_degrees).astype(np.int64)
+
+        # Wiersze posortowane po komórce - każda komórka to ciągły fragment tablicy
+        order = np.lexsort((cell_x, cell_y))
+        cell_y, cell_x, rows = cell_y[order], cell_x[order], rows[order]
+        boundaries = np.flatnonzero((np.diff(cell_y) != 0) | (np.diff(cell_x) != 0)) + 1
+        starts = np.concatenate([[0], boundaries]).astype(np.int64)
+        ends = np.concatenate([boundaries, [len(rows)]]).astype(np.int64)
+        self._cells: dict[tuple[int, int], np.ndarray] = {
+            (int(cell_y[start]), int(cell_x[start])): rows[start:end] for start, end in zip(starts, ends)
+        }
+        if self._cells:
+            self._cell_y_range = (int(cell_y.min()), int(cell_y.max()))
+            self._cell_x_range = (int(cell_x.min()), int(cell_x.max()))
+
+    def __len__(self) -> int:
+        return len(self._indexed_rows)
+
+    def _cell_of(self, latitude: float, longitude: float) -> tuple[int, int]:
+        return math.floor(latitude / self._cell_degrees), math.floor(longitude / self._cell_degrees)
+
+    def _distances(self, latitude: float, longitude: float, rows: np.ndarray,
+                   candidate_mask: np.ndarray | None) -> tuple[np.ndarray, np.ndarray]:
+        if candidate_mask is not None:
+            rows = rows[candidate_mask[rows]]
+        return rows, haversine_km(latitude, longitude, self._latitudes[rows], self._longitudes[rows])
+
+    def _rows_in_cells(self, cells) -> np.ndarray:
+        found = [self._cells[cell] for cell in cells if cell in self._cells]
+        return np.concatenate(found) if found else np.empty(0, dtype=np.int64)
+
+    def _ring_distance_km(self, ring: int, latitude: float) -> float:
+        """
+        Dolne ograniczenie odległości po wielkim kole od punktu (w komórce środkowej) do punktów spoza
+        pierścieni 0..ring. Taki punkt leży o co najmniej ring komórek dalej w pionie albo w poziomie;
+        w tym drugim przypadku jego szerokość nie przekracza |latitude| + (ring + 1) komórek.
+        """
+        angle = math.radians(ring * self._cell_degrees)
+        along_meridian = EARTH_RADIUS_KM * angle
+        cos_latitude = math.cos(math.radians(min(abs(latitude) + (ring + 1) * self._cell_degrees, 90)))
+        along_parallel = 2 * EARTH_RADIUS_KM * math.asin(min(1.0, cos_latitude * math.sin(min(angle, math.pi) / 2)))
+        return min(along_meridian, along_parallel)
+
+    def within_radius(self, latitude: float, longitude: float, radius_km: float,
+                      candidate_mask: np.ndarray | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Zwraca (wiersze, odległości w km) punktów w promieniu radius_km, posortowane rosnąco po odległości.
+        candidate_mask (maska logiczna po wszystkich wierszach) ogranicza wynik do wybranych punktów,
+        np. tras spełniających pozostałe preferencje.
+        """
+        if not self._cells or radius_km < 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        # Prostokąt opisany na kole o promieniu radius_km na sferze
+        angular_radius = radius_km / EARTH_RADIUS_KM
+        latitude_span = math.degrees(angular_radius)
+        longitude_span = math.inf
+        if abs(latitude) + latitude_span < 90:
+            longitude_span = math.degrees(math.asin(math.sin(angular_radius) / math.cos(math.radians(latitude))))
+
+        if longitude_span >= 180 or abs(longitude) + longitude_span > 180:
+            rows = self._indexed_rows
+        else:
+            low_y, low_x = self._cell_of(latitude - latitude_span, longitude - longitude_span)
+            high_y, high_x = self._cell_of(latitude + latitude_span, longitude + longitude_span)
+            if (high_y - low_y + 1) * (high_x - low_x + 1) <= len(self._cells):
+                cells = ((y, x) for y in range(low_y, high_y + 1) for x in range(low_x, high_x + 1))
+            else:
+                # Obszar obejmuje więcej komórek niż jest niepustych - taniej przejrzeć niepuste
+                cells = [cell for cell in self._cells if low_y <= cell[0] <= high_y and low_x <= cell[1] <= high_x]
+            rows = self._rows_in_cells(cells)
+
+        rows, distances = self._distances(latitude, longitude, rows, candidate_mask)
+        inside = distances <= radius_km
+        rows, distances = rows[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")
+        return rows[order], distances[order]
+
+    def nearest(self, latitude: float, longitude: float, k: int, candidate_mask: np.ndarray | None = None,
+                max_distance_km: float | None = None) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Zwraca (wiersze, odległości w km) co najwyżej k najbliższych punktów, posortowane rosnąco po odległości.
+        Opcjonalnie tylko spośród candidate_mask i nie dalej niż max_distance_km.
+        """
+        if not self._cells or k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        center_y, center_x = self._cell_of(latitude, longitude)
+        max_ring = max(abs(center_y - self._cell_y_range[0]), abs(center_y - self._cell_y_range[1]),
+                       abs(center_x - self._cell_x_range[0]), abs(center_x - self._cell_x_range[1]))
+        found_rows, found_distances = [], []
+        found_count = 0
+        kth_distance = math.inf
+        ring = 0
+        while ring <= max_ring:
+            if (2 * ring + 1) ** 2 > len(self._cells):
+                # Odwiedzono już więcej komórek, niż jest niepustych - taniej przejrzeć wszystkie punkty
+                rows, distances = self._distances(latitude, longitude, self._indexed_rows, candidate_mask)
+                found_rows, found_distances = [rows], [distances]
+                break
+
+            if ring == 0:
+                cells = [(center_y, center_x)]
+            else:
+                cells = [(center_y + dy, center_x + dx) for dy in (-ring, ring) for dx in range(-ring, ring + 1)]
+                cells += [(center_y + dy, center_x + dx) for dx in (-ring, ring) for dy in range(-ring + 1, ring)]
+            rows, distances = self._distances(latitude, longitude, self._rows_in_cells(cells), candidate_mask)
+            if len(rows):
+                found_rows.append(rows)
+                found_distances.append(distances)
+                found_count += len(rows)
+                if found_count >= k:
+                    kth_distance = np.partition(np.concatenate(found_distances), k - 1)[k - 1]
+
+            # Żaden punkt z dalszych pierścieni nie może być bliżej niż lower_bound
+            lower_bound = self._ring_distance_km(ring, latitude)
+            if kth_distance <= lower_bound or (max_distance_km is not None and lower_bound > max_distance_km):
+                break
+            ring += 1
+
+        if not found_rows:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        rows, distances = np.concatenate(found_rows), np.concatenate(found_distances)
+        if max_distance_km is not None:
+            inside = distances <= max_distance_km
+            rows, distances = rows[inside], distances[inside]
+        order = np.argsort(distances, kind="stable")[:k]
+        return rows[order], distances[order]
@@ -1,55 +1,447 @@
-import openmeteo_requests
-import requests_cache
-from retry_requests import retry
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from src.data_handlers.forecast_archive import ForecastArchive
+from src.data_handlers.forecast_sources import ForecastSource, LiveForecastSource, HOURLY_VARIABLES
+from src.data_handlers.request_budget import RequestBudget, PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND
 from src.models.weather_data import WeatherData
-from src.utils.constants import FORECAST_DAYS
+from src.utils.tracing import tracer
+from src.utils.constants import FORECAST_DAYS, WEATHER_CACHE_EXPIRE_SECONDS, WEATHER_MAX_CONNECTIONS, \
+    TRICITY_COORDS, FORECAST_MODEL_RUN_HOURS_UTC, PREFETCH_OFFSET_MINUTES, PREFETCH_JITTER_SECONDS, \
+    PREFETCH_MAX_CONCURRENCY, WEATHER_BUDGET_MAX_WAIT_SECONDS, WEATHER_RETRIES, WEATHER_BACKOFF_FACTOR
 
 
 class WeatherDataManager:
     """
     Zarządza pobieraniem i przetwarzaniem danych pogodowych z API
     """
-    def __init__(self):
+    def __init__(self, source: ForecastSource | None = None, archive: ForecastArchive | None = None,
+                 budget: RequestBudget | None = None):
         """
-        Inicjalizuje klienta API z pamięcią podręczną i mechanizmem ponawiania.
+        Inicjalizuje menedżera z podanym źródłem prognoz.
+
+        Domyślnie używany jest LiveForecastSource (API Open-Meteo z pamięcią podręczną). Przejściowe błędy
+        pobrania są ponawiane do WEATHER_RETRIES razy, a każda próba zużywa zapytanie z budżetu.
+        Do testów offline można przekazać RecordedForecastSource lub SyntheticForecastSource.
+        Jeśli podano archive, pobrane prognozy są dopisywane do archiwum na dysku w osobnym wątku (jeden zapis
+        na przebieg modelu i lokalizację) - zapytania nie czekają na zapis; close() czeka na zaległe zapisy.
+        budget ogranicza liczbę zapytań do API (domyślnie limity darmowego planu Open-Meteo); źródła lokalne
+        (nagrania, generator) nie są nim objęte.
         """
-        # Konfiguracja klienta Open-Meteo API z pamięcią podręczną i ponawianiem prób w razie błędów
-        cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-        self._openmeteo = openmeteo_requests.Client(session=retry_session)
+        self._source = source if source is not None else LiveForecastSource()
+        self._archive = archive
+        # Jeden wątek zapisu zachowuje kolejność prognoz w archiwum
+        self._archive_writer = (ThreadPoolExecutor(max_workers=1, thread_name_prefix="forecast-archive")
+                                if archive is not None else None)
+        self._budget = budget if budget is not None else RequestBudget()
+        # Zapytania obsłużone bez pobierania z powodu wyczerpanego budżetu
+        self._budget_counters = {"stale_served": 0, "unserved": 0, "prefetch_skipped": 0}
+
+        # Wspólna pamięć podręczna przetworzonych prognoz: klucz -> (czas pobrania, czas ważności, prognoza)
+        self._forecast_cache: dict[tuple[float, float], tuple[float, float, list[WeatherData]]] = {}
+        self._forecast_cache_lock = threading.Lock()
+        # Zwiększany przy każdej nowej prognozie w pamięci - pozwala unieważniać wyniki zależne od prognoz
+        self._forecast_version = 0
+        # Zapytania asynchroniczne w toku - kilka równoczesnych żądań o to samo miejsce czeka na jedno pobranie
+        self._inflight: dict[tuple[float, float], asyncio.Task] = {}
+
+        # Wszystkie znane lokalizacje (centra miast oraz każda lokalizacja, o którą pytano) - odświeżane w tle
+        self._known_locations: dict[tuple[float, float], tuple[float, float]] = {}
+        for coords in TRICITY_COORDS.values():
+            self.register_location(coords['latitude'], coords['longitude'])
+
+        # Stan harmonogramu odświeżania prognoz w tle
+        self._prefetch_thread: threading.Thread | None = None
+        self._prefetch_stop = threading.Event()
+        # Stan czytany z wątku interfejsu i zmieniany w wątku harmonogramu - dostęp pod blokadą
+        self._prefetch_status_lock = threading.Lock()
+        self._prefetch_status = {
+            "running": False,
+            "last_error": None,
+            "last_scheduled_at": None,
+            "last_completed_at": None,
+            "refresh_lag_seconds": None,
+            "locations_refreshed": 0,
+            "locations_failed": 0,
+            "locations_skipped": 0,
+            "next_refresh_at": None
+        }
         print("WeatherDataManager initialized.")
 
-    def get_weather_for_location(self, latitude: float, longitude: float) -> list[WeatherData]:
+    @property
+    def archive(self) -> ForecastArchive | None:
+        return self._archive
+
+    @property
+    def forecast_version(self) -> int:
+        """Numer wersji prognoz w pamięci podręcznej - zmienia się po każdym pobraniu nowej prognozy."""
+        return self._forecast_version
+
+    @staticmethod
+    def _cache_key(latitude: float, longitude: float) -> tuple[float, float]:
+        return round(latitude, 4), round(longitude, 4)
+
+    @staticmethod
+    def _build_params(latitude: float, longitude: float) -> dict:
+        return {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": HOURLY_VARIABLES,
+            "timezone": "auto",
+            "forecast_days": FORECAST_DAYS
+        }
+
+    def register_location(self, latitude: float, longitude: float):
+        """Dodaje lokalizację do zbioru odświeżanego przez harmonogram w tle."""
+        with self._forecast_cache_lock:
+            self._known_locations.setdefault(self._cache_key(latitude, longitude), (latitude, longitude))
+
+    def _get_cached_forecast(self, latitude: float, longitude: float,
+                             allow_stale: bool = False) -> list[WeatherData] | None:
+        """Zwraca prognozę z pamięci podręcznej, o ile nie minął jej czas ważności (lub dowolną, jeśli allow_stale)."""
+        with self._forecast_cache_lock:
+            entry = self._forecast_cache.get(self._cache_key(latitude, longitude))
+        if entry is None:
+            return None
+        _, expires_at, forecast = entry
+        if time.time() > expires_at and not allow_stale:
+            return None
+        return forecast
+
+    def _serve_stale(self, latitude: float, longitude: float) -> list[WeatherData]:
+        """
+        Odpowiedź, gdy nie można pobrać nowej prognozy: przeterminowana prognoza z pamięci podręcznej
+        (lepsza niż żadna) albo pusta lista.
+        """
+        stale = self._get_cached_forecast(latitude, longitude, allow_stale=True)
+        with self._forecast_cache_lock:
+            self._budget_counters["stale_served" if stale else "unserved"] += 1
+        return stale if stale else []
+
+    def _acquire_wait_seconds(self, priority: str) -> float:
+        """Zapytania użytkownika mogą krótko poczekać na wolny limit, zapytania w tle nie czekają."""
+        return WEATHER_BUDGET_MAX_WAIT_SECONDS if priority == PRIORITY_INTERACTIVE else 0.0
+
+    def _acquire_budget(self, priority: str, params: dict) -> bool:
+        """
+        Pobiera żeton budżetu dla jednej próby pobrania przez fetch(). Źródła lokalne i odpowiedzi
+        z pamięci podręcznej HTTP źródła nie zużywają budżetu.
+        """
+        if not self._source.is_remote or self._source.is_cached(params):
+            return True
+        return self._budget.acquire(priority, self._acquire_wait_seconds(priority))
+
+    async def _acquire_budget_async(self, priority: str) -> bool:
+        """Jak _acquire_budget dla fetch_async(), które zawsze wysyła zapytanie do API źródła zdalnego."""
+        if not self._source.is_remote:
+            return True
+        return await self._budget.acquire_async(priority, self._acquire_wait_seconds(priority))
+
+    @staticmethod
+    def _retry_delay(attempt: int) -> float:
+        """Losowe (jitter) wykładnicze opóźnienie przed kolejną próbą pobrania."""
+        return random.uniform(0, WEATHER_BACKOFF_FACTOR * (2 ** attempt))
+
+    def _store_forecast(self, latitude: float, longitude: float, forecast: list[WeatherData],
+                        expires_at: float | None = None):
+        if not forecast:
+            return
+        now = time.time()
+        if expires_at is None:
+            expires_at = now + WEATHER_CACHE_EXPIRE_SECONDS
+        with self._forecast_cache_lock:
+            self._forecast_cache[self._cache_key(latitude, longitude)] = (now, expires_at, forecast)
+            self._forecast_version += 1
+
+        if self._archive_writer is not None:
+            try:
+                self._archive_writer.submit(self._archive_forecast, latitude, longitude, forecast, now)
+            except RuntimeError:
+                # Wątek zapisu został już zatrzymany przez close() - zapisujemy od razu
+                self._archive_forecast(latitude, longitude, forecast, now)
+
+    def _archive_forecast(self, latitude: float, longitude: float, forecast: list[WeatherData], issued_at: float):
+        try:
+            self._archive.append(latitude, longitude, forecast, issued_at=issued_at)
+        except OSError as e:
+            print(f"Błąd zapisu prognozy do archiwum dla ({latitude}, {longitude}): {e}")
+
+    def get_weather_for_location(self, latitude: float, longitude: float,
+                                 priority: str = PRIORITY_INTERACTIVE) -> list[WeatherData]:
         """
         Pobiera prognozę pogody dla podanej lokalizacji i zwraca listę obiektów WeatherData.
 
+        Każda próba pobrania z API (także ponowienie po błędzie przejściowym) zużywa jedno zapytanie z budżetu.
+        Gdy budżet jest wyczerpany lub pobranie się nie powiedzie, zwracana jest przeterminowana prognoza
+        z pamięci podręcznej, jeśli istnieje.
+
         Args:
             latitude (float): Szerokość geograficzna.
             longitude (float): Długość geograficzna.
+            priority (str): PRIORITY_INTERACTIVE (zapytanie użytkownika) lub PRIORITY_BACKGROUND.
 
         Returns:
             list[WeatherData]: Lista obiektów z danymi pogodowymi dla kolejnych godzin.
                                Zwraca pustą listę w przypadku błędu.
         """
-        url = "https://api.open-meteo.com/v1/forecast"
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "hourly": ["temperature_2m", "precipitation_probability", "precipitation", "sunshine_duration",
-                       "cloud_cover"],
-            "timezone": "auto",
-            "forecast_days": FORECAST_DAYS
-        }
+        with tracer.span("forecast", "weather", latitude=latitude, longitude=longitude, priority=priority) as span:
+            self.register_location(latitude, longitude)
+            cached = self._get_cached_forecast(latitude, longitude)
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                return cached
+
+            params = self._build_params(latitude, longitude)
+            for attempt in range(WEATHER_RETRIES + 1):
+                with tracer.span("budget_wait", "weather", attempt=attempt) as budget_span:
+                    granted = self._acquire_budget(priority, params)
+                    budget_span.set(granted=granted)
+                if not granted:
+                    print(f"Przekroczono limit zapytań do API - prognoza dla ({latitude}, {longitude}) "
+                          f"z pamięci podręcznej.")
+                    span.set(served="stale")
+                    return self._serve_stale(latitude, longitude)
+
+                try:
+                    with tracer.span("fetch", "weather", attempt=attempt):
+                        responses = self._source.fetch(params)
+                    break
+                except Exception as e:
+                    if attempt == WEATHER_RETRIES or not self._source.is_transient_error(e):
+                        print(f"Błąd podczas pobierania prognozy dla ({latitude}, {longitude}): {e}")
+                        span.set(served="stale")
+                        return self._serve_stale(latitude, longitude)
+                time.sleep(self._retry_delay(attempt))
+
+            with tracer.span("parse", "weather"):
+                weather_forecast = self._parse_responses(responses, latitude, longitude)
+            self._store_forecast(latitude, longitude, weather_forecast)
+            span.set(served="fresh" if weather_forecast else "stale")
+            return weather_forecast or self._serve_stale(latitude, longitude)
+
+    async def _download_forecast_async(self, latitude: float, longitude: float, priority: str,
+                                       expires_at: float | None = None) -> list[WeatherData] | None:
+        """
+        Pobiera prognozę z ponawianiem przejściowych błędów; każda próba zużywa zapytanie z budżetu.
+        Zwraca None, gdy zabrakło budżetu, i pustą listę, gdy pobranie się nie powiodło.
+        """
+        params = self._build_params(latitude, longitude)
+        for attempt in range(WEATHER_RETRIES + 1):
+            if not await self._acquire_budget_async(priority):
+                return None
+            try:
+                with tracer.span("fetch", "weather", latitude=latitude, longitude=longitude, attempt=attempt):
+                    responses = await self._source.fetch_async(params)
+                break
+            except Exception as e:
+                if attempt == WEATHER_RETRIES or not self._source.is_transient_error(e):
+                    print(f"Błąd podczas pobierania prognozy dla ({latitude}, {longitude}): {e}")
+                    return []
+            await asyncio.sleep(self._retry_delay(attempt))
 
+        with tracer.span("parse", "weather", latitude=latitude, longitude=longitude):
+            weather_forecast = self._parse_responses(responses, latitude, longitude)
+        self._store_forecast(latitude, longitude, weather_forecast, expires_at)
+        return weather_forecast
+
+    async def _fetch_within_budget_async(self, latitude: float, longitude: float, priority: str) -> list[WeatherData]:
+        forecast = await self._download_forecast_async(latitude, longitude, priority)
+        if forecast is None:
+            print(f"Przekroczono limit zapytań do API - prognoza dla ({latitude}, {longitude}) z pamięci podręcznej.")
+            return self._serve_stale(latitude, longitude)
+        return forecast or self._serve_stale(latitude, longitude)
+
+    async def get_weather_for_location_async(self, latitude: float, longitude: float,
+                                             priority: str = PRIORITY_INTERACTIVE) -> list[WeatherData]:
+        """
+        Asynchroniczny odpowiednik get_weather_for_location.
+
+        Korzysta z tej samej pamięci podręcznej prognoz i tego samego budżetu zapytań, a równoczesne
+        zapytania o tę samą lokalizację są łączone w jedno wywołanie API.
+        """
+        self.register_location(latitude, longitude)
+        cached = self._get_cached_forecast(latitude, longitude)
+        if cached is not None:
+            return cached
+
+        key = self._cache_key(latitude, longitude)
+        task = self._inflight.get(key)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._fetch_within_budget_async(latitude, longitude, priority))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _task, k=key: self._inflight.pop(k, None))
+        return await asyncio.shield(task)
+
+    async def get_weather_for_locations_async(self, locations: list[tuple[float, float]],
+                                              max_concurrency: int = WEATHER_MAX_CONNECTIONS,
+                                              priority: str = PRIORITY_INTERACTIVE
+                                              ) -> dict[tuple[float, float], list[WeatherData]]:
+        """
+        Pobiera równolegle prognozy dla wielu lokalizacji, ograniczając liczbę jednoczesnych zapytań.
+
+        Returns:
+            dict: Mapowanie (szerokość, długość) -> lista WeatherData (pusta w przypadku błędu).
+        """
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def fetch(lat: float, lon: float) -> list[WeatherData]:
+            async with semaphore:
+                return await self.get_weather_for_location_async(lat, lon, priority)
+
+        unique_locations = list(dict.fromkeys(locations))
+        forecasts = await asyncio.gather(*(fetch(lat, lon) for lat, lon in unique_locations))
+        return dict(zip(unique_locations, forecasts))
+
+    async def aclose(self):
+        """Zwalnia zasoby asynchroniczne źródła prognoz (np. pulę połączeń)."""
+        await self._source.aclose()
+
+    def close(self):
+        """Czeka na zapis zaległych prognoz do archiwum i zatrzymuje wątek zapisu."""
+        if self._archive_writer is not None:
+            self._archive_writer.shutdown(wait=True)
+
+    @staticmethod
+    def _next_refresh_time(now: datetime) -> datetime:
+        """
+        Zwraca najbliższy moment odświeżenia: godzina przebiegu modelu (UTC) + PREFETCH_OFFSET_MINUTES.
+        """
+        offset = timedelta(minutes=PREFETCH_OFFSET_MINUTES)
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        # Przeglądamy przebiegi z poprzedniego, bieżącego i następnego dnia, bo przesunięcie może przekroczyć północ
+        for day_offset in (-1, 0, 1):
+            for run_hour in FORECAST_MODEL_RUN_HOURS_UTC:
+                candidate = day_start + timedelta(days=day_offset, hours=run_hour) + offset
+                if candidate > now:
+                    return candidate
+        return day_start + timedelta(days=2, hours=FORECAST_MODEL_RUN_HOURS_UTC[0]) + offset
+
+    def start_prefetch(self):
+        """
+        Uruchamia w tle harmonogram, który odświeża prognozy dla wszystkich znanych lokalizacji
+        krótko po każdym przebiegu modelu, tak aby pamięć podręczna była gotowa przed zapytaniem użytkownika.
+        """
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return
+        self._prefetch_stop.clear()
+        self._prefetch_thread = threading.Thread(target=self._prefetch_loop, name="forecast-prefetch", daemon=True)
+        self._prefetch_thread.start()
+        print("Forecast prefetch scheduler started.")
+
+    def stop_prefetch(self, timeout: float | None = 5.0):
+        """Zatrzymuje harmonogram odświeżania i czeka na zakończenie wątku."""
+        self._prefetch_stop.set()
+        if self._prefetch_thread is not None:
+            self._prefetch_thread.join(timeout)
+        self._prefetch_thread = None
+
+    def get_prefetch_status(self) -> dict:
+        """
+        Zwraca stan harmonogramu odświeżania.
+
+        refresh_lag_seconds to opóźnienie zakończenia ostatniego odświeżenia względem jego
+        planowanego momentu, a oldest_forecast_age_seconds - wiek najstarszej prognozy w pamięci.
+        last_error to błąd ostatniego nieudanego odświeżenia (None, jeśli kolejne odświeżenie się powiodło).
+        """
+        with self._prefetch_status_lock:
+            status = dict(self._prefetch_status)
+        with self._forecast_cache_lock:
+            fetch_times = [fetched_at for fetched_at, _, _ in self._forecast_cache.values()]
+            status["known_locations"] = len(self._known_locations)
+        status["oldest_forecast_age_seconds"] = time.time() - min(fetch_times) if fetch_times else None
+        return status
+
+    def get_budget_status(self) -> dict:
+        """
+        Zwraca stan budżetu zapytań do API: dostępne zapytania w każdym limicie, liczbę przyznanych
+        i odrzuconych zapytań według priorytetu oraz liczbę odpowiedzi udzielonych bez pobierania
+        (stale_served - przeterminowana prognoza, unserved - brak prognozy, prefetch_skipped - pominięte odświeżenia).
+        """
+        status = self._budget.usage()
+        with self._forecast_cache_lock:
+            status.update(self._budget_counters)
+        return status
+
+    def _update_prefetch_status(self, **changes):
+        with self._prefetch_status_lock:
+            self._prefetch_status.update(changes)
+
+    def _prefetch_loop(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._update_prefetch_status(running=True)
         try:
-            responses = self._openmeteo.weather_api(url, params=params)
-        except Exception as e:
-            print(f"Błąd podczas wywołania API Open-Meteo dla ({latitude}, {longitude}): {e}")
-            return []
+            # Pierwsze odświeżenie od razu, aby rozgrzać pamięć podręczną po starcie aplikacji
+            scheduled = datetime.now(timezone.utc)
+            while True:
+                next_refresh = self._next_refresh_time(datetime.now(timezone.utc))
+                try:
+                    loop.run_until_complete(self._refresh_known_locations_async(scheduled, next_refresh))
+                except Exception as e:
+                    # Nieudane odświeżenie nie zatrzymuje harmonogramu - kolejna próba w następnym terminie
+                    print(f"Błąd odświeżania prognoz w tle: {e}")
+                    self._update_prefetch_status(last_error=f"{type(e).__name__}: {e}")
+                self._update_prefetch_status(next_refresh_at=next_refresh)
+
+                delay = (next_refresh - datetime.now(timezone.utc)).total_seconds()
+                delay += random.uniform(0, PREFETCH_JITTER_SECONDS)
+                if self._prefetch_stop.wait(max(0.0, delay)):
+                    break
+                scheduled = next_refresh
+        finally:
+            try:
+                loop.run_until_complete(self.aclose())
+            except Exception as e:
+                print(f"Błąd zamykania połączeń harmonogramu odświeżania prognoz: {e}")
+            loop.close()
+            self._update_prefetch_status(running=False)
+
+    async def _refresh_known_locations_async(self, scheduled: datetime, next_refresh: datetime):
+        """
+        Pobiera ponownie prognozy dla wszystkich znanych lokalizacji (z pominięciem pamięci podręcznej).
+        Odświeżone prognozy są ważne do następnego planowanego odświeżenia.
+
+        Odświeżanie korzysta z budżetu z priorytetem PRIORITY_BACKGROUND i nie czeka na wolny limit - lokalizacje,
+        na które budżet nie wystarcza, są pomijane (zostaje dotychczasowa prognoza), a rezerwa budżetu
+        pozostaje dla zapytań użytkownika.
+        """
+        semaphore = asyncio.Semaphore(PREFETCH_MAX_CONCURRENCY)
+        expires_at = next_refresh.timestamp() + PREFETCH_JITTER_SECONDS + WEATHER_CACHE_EXPIRE_SECONDS
+
+        async def refresh(lat: float, lon: float) -> bool | None:
+            async with semaphore:
+                forecast = await self._download_forecast_async(lat, lon, PRIORITY_BACKGROUND, expires_at)
+                return None if forecast is None else bool(forecast)
+
+        with self._forecast_cache_lock:
+            locations = list(self._known_locations.values())
+        results = await asyncio.gather(*(refresh(lat, lon) for lat, lon in locations))
+        refreshed = sum(result is True for result in results)
+        skipped = sum(result is None for result in results)
+        with self._forecast_cache_lock:
+            self._budget_counters["prefetch_skipped"] += skipped
 
+        completed = datetime.now(timezone.utc)
+        refresh_lag_seconds = (completed - scheduled).total_seconds()
+        self._update_prefetch_status(
+            last_error=None,
+            last_scheduled_at=scheduled,
+            last_completed_at=completed,
+            refresh_lag_seconds=refresh_lag_seconds,
+            locations_refreshed=refreshed,
+            locations_failed=len(results) - refreshed - skipped,
+            locations_skipped=skipped
+        )
+        print(f"Prefetched forecasts for {refreshed}/{len(results)} locations "
+              f"(lag {refresh_lag_seconds:.1f}s, {skipped} skipped over budget).")
+
+    def _parse_responses(self, responses: list, latitude: float, longitude: float) -> list[WeatherData]:
         if not responses:
             print(f"Brak odpowiedzi z API dla ({latitude}, {longitude}).")
             return []
@@ -73,7 +465,7 @@ class WeatherDataManager:
                                  date  temperature_2m  precipitation_probability  precipitation  sunshine_duration  cloud_cover
         0   2025-05-24 14:00:00+00:00            18.5                         10            0.0             3600.0           25
         1   2025-05-24 15:00:00+00:00            19.1                         15            0.0             3200.0           35
-        
+
         Po stworzeniu tej ustrukturyzowanej tabeli, pętla `for` poniżej używająca metody .iterrows()
         może łatwo przejść przez nią wiersz po wierszu, aby dla każdej godziny stworzyć
         jeden obiekt klasy WeatherData i dodać go do finalnej listy z prognozą.
@@ -109,4 +501,4 @@ class WeatherDataManager:
 
         print(
             f"Successfully fetched and processed {len(weather_forecast)} hourly weather points for ({latitude}, {longitude}).")
-        return weather_forecast
\ No newline at end of file
+        return weather_forecast
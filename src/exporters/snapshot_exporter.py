@@ -0,0 +1,212 @@
+import datetime
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Dict, List
+
+import numpy as np
+from PIL import Image
+
+from src.models.user_preference import UserPreference
+from src.recommenders.route_recommender import RouteRecommender
+from src.utils.constants import SNAPSHOT_PROFILES, SNAPSHOT_ROUTES_PER_PROFILE, SNAPSHOT_HEAT_STRIP_CELL, \
+    SNAPSHOT_WRITE_WORKERS
+
+MANIFEST_NAME = "manifest.json"
+# Długość skrótu SHA-256 w nazwach plików (64 bity wystarczą do rozróżnienia wersji jednego katalogu)
+HASH_NAME_LENGTH = 16
+
+
+def render_heat_strip(colors: List[str], cell_size: tuple[int, int] = SNAPSHOT_HEAT_STRIP_CELL) -> bytes:
+    """
+    Rysuje pasek komfortu: jedno pole na dzień w kolorze z kalendarza (np. '#2E8B57'). Zwraca plik PNG.
+
+    Obraz jest zapisywany z paletą zawierającą tylko użyte kolory, więc pasek 14 dni zajmuje
+    ok. 100 bajtów, a te same kolory zawsze dają identyczny plik (i ten sam skrót).
+    """
+    palette_colors = list(dict.fromkeys(colors))
+    width, height = cell_size
+    indices = np.repeat(np.array([palette_colors.index(color) for color in colors], dtype=np.uint8), width)
+    image = Image.fromarray(np.tile(indices, (height, 1)))
+    image.putpalette([int(color[i:i + 2], 16) for color in palette_colors for i in (1, 3, 5)])
+    buffer = BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _hashed_name(directory: str, stem: str, extension: str, data: bytes) -> tuple[str, str]:
+    """Zwraca (ścieżka względna z fragmentem skrótu w nazwie, pełny skrót SHA-256) dla zawartości pliku."""
+    digest = hashlib.sha256(data).hexdigest()
+    name = f"{stem}.{digest[:HASH_NAME_LENGTH]}{extension}" if stem else f"{digest[:HASH_NAME_LENGTH]}{extension}"
+    return f"{directory}/{name}", digest
+
+
+def _to_json_bytes(data: dict) -> bytes:
+    return json.dumps(data, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+class SnapshotExporter:
+    """
+    Eksportuje rekomendacje dla stałego zestawu profili preferencji do statycznych plików,
+    które można serwować bez uruchamiania aplikacji (kiosk, CDN).
+
+    Struktura katalogu wyjściowego:
+
+        manifest.json                     - punkt wejścia: profil -> plik JSON, skrót, liczba tras
+        profiles/<profil>.<skrót>.json     - rekomendacje profilu (zwarty JSON)
+        strips/<skrót>.png                 - paski komfortu na kolejne dni
+
+    Pliki w profiles/ i strips/ mają skrót zawartości w nazwie, więc nigdy się nie zmieniają i mogą być
+    buforowane bez ograniczeń; istniejące pliki są pomijane. manifest.json jest nadpisywany tylko wtedy,
+    gdy zmieniła się jego treść. Renderowanie pasków i zapis plików odbywa się równolegle, a każdy plik
+    jest zapisywany atomowo (plik tymczasowy + zmiana nazwy), więc serwer nigdy nie widzi połowy pliku.
+    Stare wersje plików nie są usuwane - klienci z wcześniejszym manifestem nadal je znajdą.
+    """
+
+    def __init__(self, recommender: RouteRecommender, output_dir: str,
+                 profiles: Dict[str, dict] | None = None, routes_per_profile: int = SNAPSHOT_ROUTES_PER_PROFILE,
+                 write_workers: int = SNAPSHOT_WRITE_WORKERS):
+        """
+        Args:
+            profiles (dict): Nazwa profilu -> pola UserPreference (jak w UserPreference.from_dict).
+                             Domyślnie SNAPSHOT_PROFILES.
+        """
+        profiles = profiles if profiles is not None else SNAPSHOT_PROFILES
+        errors = UserPreference.validate_many(list(profiles.values()))
+        for name, error in zip(profiles, errors):
+            if error is not None:
+                raise ValueError(f"Niepoprawny profil migawki '{name}': {error}")
+
+        self._recommender = recommender
+        self._output_dir = output_dir
+        self._profiles = {name: UserPreference.from_dict(fields) for name, fields in profiles.items()}
+        self._routes_per_profile = routes_per_profile
+        self._write_workers = write_workers
+
+    def export(self) -> dict:
+        """
+        Oblicza rekomendacje dla wszystkich profili i zapisuje migawkę.
+
+        Returns:
+            dict: {"profiles", "files_written", "files_skipped", "manifest_changed"}.
+        """
+        recommendations = {name: self._recommender.recommend(preferences)[:self._routes_per_profile]
+                           for name, preferences in self._profiles.items()}
+
+        # Ten sam kalendarz kolorów (np. trasy z tego samego miasta) daje ten sam pasek - renderujemy go raz
+        unique_strips = list(dict.fromkeys(
+            tuple(day["color"] for day in item["calendar"])
+            for items in recommendations.values() for item in items if item["calendar"]
+        ))
+        with ThreadPoolExecutor(max_workers=self._write_workers) as pool:
+            strip_files = dict(zip(unique_strips, pool.map(render_heat_strip, unique_strips)))
+
+            files: dict[str, bytes] = {}
+            strip_paths = {}
+            for colors, data in strip_files.items():
+                path, _ = _hashed_name("strips", "", ".png", data)
+                strip_paths[colors] = path
+                files[path] = data
+
+            manifest_profiles = {}
+            for name, items in recommendations.items():
+                data = _to_json_bytes(self._profile_document(name, items, strip_paths))
+                path, digest = _hashed_name("profiles", name, ".json", data)
+                files[path] = data
+                manifest_profiles[name] = {"file": path, "sha256": digest, "routes": len(items)}
+
+            written = list(pool.map(lambda item: self._write_if_missing(*item), files.items()))
+
+        manifest_changed = self._write_manifest(manifest_profiles)
+        summary = {
+            "profiles": len(manifest_profiles),
+            "files_written": sum(written),
+            "files_skipped": len(written) - sum(written),
+            "manifest_changed": manifest_changed
+        }
+        print(f"Exported snapshot of {summary['profiles']} profiles to {self._output_dir} "
+              f"({summary['files_written']} files written, {summary['files_skipped']} unchanged).")
+        return summary
+
+    @staticmethod
+    def _profile_document(name: str, items: List[Dict[str, Any]], strip_paths: dict) -> dict:
+        dates = next((item["calendar"] for item in items if item["calendar"]), [])
+        return {
+            "profile": name,
+            "dates": [day["date"].isoformat() for day in dates],
+            "routes": [
+                {
+                    "id": item["route"].id,
+                    "name": item["route"].name,
+                    "region": item["route"].region,
+                    "difficulty": item["route"].difficulty,
+                    "rating": item["route"].rating,
+                    "length_km": item["route"].length_km,
+                    "estimated_time_hours": round(item["route"].estimated_time_hours, 2),
+                    "link": item["route"].link,
+                    "image_link": item["route"].image_link,
+                    "score": round(item["score"], 4),
+                    "comfort": [day["score"] for day in item["calendar"]],
+                    "heat_strip": strip_paths.get(tuple(day["color"] for day in item["calendar"]))
+                }
+                for item in items
+            ]
+        }
+
+    def _write_manifest(self, profiles: dict) -> bool:
+        """Zapisuje manifest, jeśli zmieniła się lista plików profili. Zwraca True, gdy plik został zapisany."""
+        path = os.path.join(self._output_dir, MANIFEST_NAME)
+        try:
+            with open(path, "rb") as f:
+                if json.load(f).get("profiles") == profiles:
+                    return False
+        except (OSError, ValueError):
+            pass
+        manifest = {
+            "generated_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+            "profiles": profiles
+        }
+        self._write_atomic(path, _to_json_bytes(manifest))
+        return True
+
+    def _write_if_missing(self, relative_path: str, data: bytes) -> bool:
+        # Nazwa zawiera skrót zawartości - istniejący plik o tej nazwie ma tę samą treść
+        path = os.path.join(self._output_dir, *relative_path.split("/"))
+        if os.path.exists(path):
+            return False
+        self._write_atomic(path, data)
+        return True
+
+    @staticmethod
+    def _write_atomic(path: str, data: bytes):
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+        descriptor, temporary_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as f:
+                f.write(data)
+            # mkstemp tworzy plik dostępny tylko dla właściciela - serwer WWW musi móc go czytać
+            os.chmod(temporary_path, 0o644)
+            os.replace(temporary_path, path)
+        except OSError:
+            if os.path.exists(temporary_path):
+                os.remove(temporary_path)
+            raise
+
+
+if __name__ == "__main__":
+    # Uruchomienie z katalogu projektu: python -m src.exporters.snapshot_exporter <katalog wyjściowy>
+    from src.data_handlers.route_data_manager import RouteDataManager
+    from src.data_handlers.weather_data_manager import WeatherDataManager
+
+    if len(sys.argv) != 2:
+        print("Użycie: python -m src.exporters.snapshot_exporter <katalog wyjściowy>")
+        sys.exit(1)
+    exporter = SnapshotExporter(
+        RouteRecommender(RouteDataManager(trails_csv_path=os.path.join("data", "trails.csv")), WeatherDataManager()),
+        sys.argv[1])
+    exporter.export()
@@ -1,11 +1,13 @@
-from src.utils.constants import BASE_WALKING_SPEED_KMH, DIFFICULTY_MULTIPLIERS, TIME_RANGES
+from src.utils.constants import BASE_WALKING_SPEED_KMH, DIFFICULTY_MULTIPLIERS, TIME_RANGES, TRICITY_COORDS
 import datetime
 
 class Route:
     # id generowane w RouteDataManager
     def __init__(self, id: int, name: str, region: str, length_km: float,
                  difficulty: str, rating: float, link: str,
-                 image_link: str):  # 'id' jest teraz jako argument, bo jest przekazywane
+                 image_link: str, listed_time_minutes: float | None = None,
+                 latitude: float | None = None,
+                 longitude: float | None = None):  # 'id' jest teraz jako argument, bo jest przekazywane
         if not isinstance(id, int) or id < 0:  # Walidacja id nadal potrzebna, bo jest przekazywane
             raise ValueError("ID musi być nieujemną liczbą całkowitą.")
         if not isinstance(name, str) or not name:
@@ -23,6 +25,16 @@ class Route:
             raise ValueError("Link do trasy nie może być pusty.")
         if not isinstance(image_link, str) or not image_link:
             raise ValueError("Link do zdjęcia nie może być pusty.")
+        if listed_time_minutes is not None and (not isinstance(listed_time_minutes, (int, float))
+                                                or listed_time_minutes <= 0):
+            raise ValueError("Podany czas przejścia musi być dodatnią liczbą minut.")
+        if (latitude is None) != (longitude is None):
+            raise ValueError("Współrzędne trasy muszą zawierać zarówno szerokość, jak i długość geograficzną.")
+        if latitude is not None and (not isinstance(latitude, (int, float)) or not (-90 <= latitude <= 90)):
+            raise ValueError("Szerokość geograficzna trasy musi być liczbą od -90 do 90.")
+        if longitude is not None and (not isinstance(longitude, (int, float))
+                                      or not (-180 <= longitude <= 180)):
+            raise ValueError("Długość geograficzna trasy musi być liczbą od -180 do 180.")
 
         self._id = id
         self._name = name
@@ -32,6 +44,9 @@ class Route:
         self._rating = rating
         self._link = link
         self._image_link = image_link
+        self._listed_time_minutes = listed_time_minutes  # czas podany w źródle danych (AllTrails), jeśli jest
+        self._latitude = latitude  # współrzędne początku trasy, jeśli są w pliku z trasami
+        self._longitude = longitude
         self._estimated_time_hours = self._calculate_estimated_time()
 
     @property
@@ -70,12 +85,40 @@ class Route:
     def estimated_time_hours(self) -> float:
         return self._estimated_time_hours
 
-    def _calculate_estimated_time(self) -> float:
+    @property
+    def listed_time_hours(self) -> float | None:
+        """Czas przejścia podany w pliku z trasami (w godzinach) lub None, jeśli go brak."""
+        if self._listed_time_minutes is None:
+            return None
+        return self._listed_time_minutes / 60
+
+    @property
+    def has_coordinates(self) -> bool:
+        """Czy trasa ma własne współrzędne (w przeciwnym razie coordinates to środek regionu)."""
+        return self._latitude is not None
+
+    @property
+    def coordinates(self) -> dict:
+        """
+        Współrzędne trasy w formacie TRICITY_COORDS. Trasy bez własnych współrzędnych
+        otrzymują środek swojego miasta (lub środek Trójmiasta dla nieznanego regionu).
+        """
+        if self._latitude is not None:
+            return {"latitude": self._latitude, "longitude": self._longitude}
+        return TRICITY_COORDS.get(self._region) or TRICITY_COORDS["Trójmiasto"]
+
+    def _calculate_estimated_time(self, walking_speed_kmh: float | None = None) -> float:
         """
         Szacuje czas przejścia trasy na podstawie długości i trudności.
         """
         difficulty_multiplier = DIFFICULTY_MULTIPLIERS.get(self._difficulty.lower(), 1.0)
-        return (self._length_km * difficulty_multiplier) / BASE_WALKING_SPEED_KMH
+        return (self._length_km * difficulty_multiplier) / (walking_speed_kmh or BASE_WALKING_SPEED_KMH)
+
+    def estimated_time_for_speed(self, walking_speed_kmh: float | None) -> float:
+        """Szacowany czas przejścia dla indywidualnej prędkości marszu (None = prędkość bazowa)."""
+        if walking_speed_kmh is None:
+            return self._estimated_time_hours
+        return self._calculate_estimated_time(walking_speed_kmh)
 
     def __repr__(self):
         return (f"Route(ID: {self._id}, Name: '{self._name}', Region: '{self._region}', "
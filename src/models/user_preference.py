@@ -1,9 +1,123 @@
 # recommender_app/src/models/user_preference.py
+import math
 
-from src.utils.constants import TIME_RANGES, LENGTH_OPTIONS, DIFFICULTY_MULTIPLIERS, MAX_RATING, CLOUD_COVER_PREFERENCES, TRICITY_COORDS
+from src.utils.constants import TIME_RANGES, LENGTH_OPTIONS, DIFFICULTY_MULTIPLIERS, MAX_RATING, CLOUD_COVER_PREFERENCES, TRICITY_COORDS, \
+    TEMPERATURE_SLIDER_STEP, RATING_SLIDER_STEP, WEIGHT_STEP
+
+# Zbiory dopuszczalnych wartości liczone raz przy imporcie, a nie przy każdym przypisaniu
+_VALID_DIFFICULTIES = frozenset(DIFFICULTY_MULTIPLIERS)
+_VALID_CLOUD_COVERS = frozenset(CLOUD_COVER_PREFERENCES)
+_VALID_CITIES = list(TRICITY_COORDS.keys()) + ["Trójmiasto"]
+_VALID_CITIES_LOWER = frozenset(c.lower() for c in _VALID_CITIES)
+
+
+def _quantize(value: float, step: float) -> float:
+    """Zaokrągla wartość do najbliższej wielokrotności kroku suwaka."""
+    if not math.isfinite(value):
+        return value
+    return round(round(value / step) * step, 6)
+
+
+# Walidatory pól UserPreference używane przez settery. Każdy zwraca znormalizowaną wartość albo zgłasza wyjątek.
+# Wartości ustawiane suwakami (temperatury, minimalna ocena, wagi) są zaokrąglane do kroku suwaka już przy
+# przypisaniu, więc filtrowanie, ocena tras i klucz pamięci podręcznej widzą tę samą wartość.
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float))
+
+
+def _validate_number(value, message: str) -> float:
+    if not _is_number(value):
+        raise ValueError(message)
+    return float(value)
+
+
+def _validate_non_negative(value, message: str) -> float:
+    if not _is_number(value) or value < 0:
+        raise ValueError(message)
+    return float(value)
+
+
+def _validate_temperature(value, message: str) -> float:
+    return _quantize(_validate_number(value, message), TEMPERATURE_SLIDER_STEP)
+
+
+def _validate_bool(value, message: str) -> bool:
+    if not isinstance(value, bool):
+        raise ValueError(message)
+    return value
+
+
+def _validate_weight(value, message: str) -> float:
+    if not _is_number(value) or not (0 <= value <= 1):
+        raise ValueError(message)
+    return _quantize(float(value), WEIGHT_STEP)
+
+
+def _validate_min_rating(value) -> float:
+    if not _is_number(value) or not (0 <= value <= MAX_RATING):
+        raise ValueError(f"Minimalna ocena musi być liczbą od 0 do {MAX_RATING}.")
+    return _quantize(float(value), RATING_SLIDER_STEP)
+
+
+def _validate_difficulty(value) -> str:
+    if value.lower() not in _VALID_DIFFICULTIES:
+        raise ValueError(
+            f"Nieznana preferowana trudność: {value}. Dopuszczalne: {list(DIFFICULTY_MULTIPLIERS.keys())}")
+    return value.lower()
+
+
+def _validate_cloud_cover(value) -> str:
+    if value.lower() not in _VALID_CLOUD_COVERS:
+        raise ValueError(
+            f"Nieznana preferencja zachmurzenia: {value}. Dopuszczalne: {list(CLOUD_COVER_PREFERENCES.keys())}")
+    return value.lower()
+
+
+def _validate_city(value) -> str:
+    if value.lower() not in _VALID_CITIES_LOWER:
+        raise ValueError(f"Nieznane preferowane miasto: {value}. Dopuszczalne: {_VALID_CITIES}")
+    return value
+
+
+def _validate_time_range(value) -> str:
+    if value not in TIME_RANGES:
+        raise ValueError(f"Nieznany preferowany zakres czasu: {value}. Dopuszczalne: {list(TIME_RANGES.keys())}")
+    return value
+
+
+def _validate_walking_speed(value) -> float | None:
+    if value is not None and (not _is_number(value) or value <= 0):
+        raise ValueError("Prędkość marszu musi być dodatnią liczbą (km/h).")
+    return float(value) if value is not None else None
+
+
+def _validate_latitude(value) -> float | None:
+    if value is not None and (not _is_number(value) or not (-90 <= value <= 90)):
+        raise ValueError("Szerokość geograficzna musi być liczbą od -90 do 90.")
+    return float(value) if value is not None else None
+
+
+def _validate_longitude(value) -> float | None:
+    if value is not None and (not _is_number(value) or not (-180 <= value <= 180)):
+        raise ValueError("Długość geograficzna musi być liczbą od -180 do 180.")
+    return float(value) if value is not None else None
+
+
+def _validate_max_distance(value) -> float | None:
+    if value is not None and (not _is_number(value) or not value > 0):
+        raise ValueError("Maksymalna odległość musi być dodatnią liczbą (km).")
+    return float(value) if value is not None else None
 
 
 class UserPreference:
+    # Stałe atrybuty zamiast __dict__ - mniej pamięci i szybszy dostęp przy wielu obiektach
+    __slots__ = ('_min_temp', '_max_temp', '_allow_precipitation', '_preferred_difficulty', '_min_length',
+                 '_max_length', '_min_rating', '_allow_night_walks', '_preferred_cloud_cover', '_preferred_city',
+                 '_weight_weather', '_weight_difficulty', '_weight_length', '_weight_rating',
+                 '_preferred_time_range', '_walking_speed_kmh', '_latitude', '_longitude', '_max_distance_km')
+
     def __init__(self,
                  min_temp: float = -10.0,
                  max_temp: float = 30.0,
@@ -19,7 +133,11 @@ class UserPreference:
                  weight_difficulty: float = 0.2,
                  weight_length: float = 0.2,
                  weight_rating: float = 0.2,  # Przywrócono weight_rating
-                 preferred_time_range: str = '2-4 godziny'
+                 preferred_time_range: str = '2-4 godziny',
+                 walking_speed_kmh: float | None = None,  # None = BASE_WALKING_SPEED_KMH
+                 latitude: float | None = None,  # położenie użytkownika - None = bez filtra odległości
+                 longitude: float | None = None,
+                 max_distance_km: float | None = None
                  ):
 
         self.min_temp = min_temp
@@ -37,6 +155,10 @@ class UserPreference:
         self.weight_length = weight_length
         self.weight_rating = weight_rating  # Przywrócono self.weight_rating
         self.preferred_time_range = preferred_time_range
+        self.walking_speed_kmh = walking_speed_kmh
+        self.latitude = latitude
+        self.longitude = longitude
+        self.max_distance_km = max_distance_km
 
     @property
     def min_temp(self) -> float:
@@ -44,9 +166,7 @@ class UserPreference:
 
     @min_temp.setter
     def min_temp(self, value: float):
-        if not isinstance(value, (int, float)):
-            raise ValueError("Minimalna temperatura musi być liczbą.")
-        self._min_temp = float(value)
+        self._min_temp = _validate_temperature(value, "Minimalna temperatura musi być liczbą.")
 
     @property
     def max_temp(self) -> float:
@@ -54,9 +174,7 @@ class UserPreference:
 
     @max_temp.setter
     def max_temp(self, value: float):
-        if not isinstance(value, (int, float)):
-            raise ValueError("Maksymalna temperatura musi być liczbą.")
-        self._max_temp = float(value)
+        self._max_temp = _validate_temperature(value, "Maksymalna temperatura musi być liczbą.")
 
     @property
     def allow_precipitation(self) -> bool:
@@ -64,9 +182,8 @@ class UserPreference:
 
     @allow_precipitation.setter
     def allow_precipitation(self, value: bool):
-        if not isinstance(value, bool):
-            raise ValueError("Dopuszczanie opadów musi być wartością logiczną (True/False).")
-        self._allow_precipitation = value
+        self._allow_precipitation = _validate_bool(
+            value, "Dopuszczanie opadów musi być wartością logiczną (True/False).")
 
     @property
     def preferred_difficulty(self) -> str:
@@ -74,10 +191,7 @@ class UserPreference:
 
     @preferred_difficulty.setter
     def preferred_difficulty(self, value: str):
-        if value.lower() not in DIFFICULTY_MULTIPLIERS:
-            raise ValueError(
-                f"Nieznana preferowana trudność: {value}. Dopuszczalne: {list(DIFFICULTY_MULTIPLIERS.keys())}")
-        self._preferred_difficulty = value.lower()
+        self._preferred_difficulty = _validate_difficulty(value)
 
     @property
     def min_length(self) -> float:
@@ -85,9 +199,7 @@ class UserPreference:
 
     @min_length.setter
     def min_length(self, value: float):
-        if not isinstance(value, (int, float)) or value < 0:
-            raise ValueError("Minimalna długość musi być nieujemną liczbą.")
-        self._min_length = float(value)
+        self._min_length = _validate_non_negative(value, "Minimalna długość musi być nieujemną liczbą.")
 
     @property
     def max_length(self) -> float:
@@ -95,9 +207,7 @@ class UserPreference:
 
     @max_length.setter
     def max_length(self, value: float):
-        if not isinstance(value, (int, float)) or value < 0:
-            raise ValueError("Maksymalna długość musi być nieujemną liczbą.")
-        self._max_length = float(value)
+        self._max_length = _validate_non_negative(value, "Maksymalna długość musi być nieujemną liczbą.")
 
     @property
     def min_rating(self) -> float:  # Przywrócono property min_rating
@@ -105,9 +215,7 @@ class UserPreference:
 
     @min_rating.setter
     def min_rating(self, value: float):  # Przywrócono setter min_rating
-        if not isinstance(value, (int, float)) or not (0 <= value <= MAX_RATING):
-            raise ValueError(f"Minimalna ocena musi być liczbą od 0 do {MAX_RATING}.")
-        self._min_rating = float(value)
+        self._min_rating = _validate_min_rating(value)
 
     @property
     def allow_night_walks(self) -> bool:
@@ -115,9 +223,8 @@ class UserPreference:
 
     @allow_night_walks.setter
     def allow_night_walks(self, value: bool):
-        if not isinstance(value, bool):
-            raise ValueError("Zezwolenie na nocne spacery musi być wartością logiczną (True/False).")
-        self._allow_night_walks = value
+        self._allow_night_walks = _validate_bool(
+            value, "Zezwolenie na nocne spacery musi być wartością logiczną (True/False).")
 
     @property
     def preferred_cloud_cover(self) -> str:
@@ -125,10 +232,7 @@ class UserPreference:
 
     @preferred_cloud_cover.setter
     def preferred_cloud_cover(self, value: str):
-        if value.lower() not in CLOUD_COVER_PREFERENCES:
-            raise ValueError(
-                f"Nieznana preferencja zachmurzenia: {value}. Dopuszczalne: {list(CLOUD_COVER_PREFERENCES.keys())}")
-        self._preferred_cloud_cover = value.lower()
+        self._preferred_cloud_cover = _validate_cloud_cover(value)
 
     @property
     def preferred_city(self) -> str:
@@ -136,11 +240,7 @@ class UserPreference:
 
     @preferred_city.setter
     def preferred_city(self, value: str):
-        from src.utils.constants import TRICITY_COORDS
-        valid_cities = list(TRICITY_COORDS.keys()) + ["Trójmiasto"]
-        if value.lower() not in [c.lower() for c in valid_cities]:
-            raise ValueError(f"Nieznane preferowane miasto: {value}. Dopuszczalne: {valid_cities}")
-        self._preferred_city = value
+        self._preferred_city = _validate_city(value)
 
     @property
     def weight_weather(self) -> float:
@@ -148,9 +248,7 @@ class UserPreference:
 
     @weight_weather.setter
     def weight_weather(self, value: float):
-        if not isinstance(value, (int, float)) or not (0 <= value <= 1):
-            raise ValueError("Waga pogody musi być liczbą od 0 do 1.")
-        self._weight_weather = float(value)
+        self._weight_weather = _validate_weight(value, "Waga pogody musi być liczbą od 0 do 1.")
 
     @property
     def weight_difficulty(self) -> float:
@@ -158,9 +256,7 @@ class UserPreference:
 
     @weight_difficulty.setter  # Poprawiono błąd w nazwie settera
     def weight_difficulty(self, value: float):
-        if not isinstance(value, (int, float)) or not (0 <= value <= 1):
-            raise ValueError("Waga trudności musi być liczbą od 0 do 1.")
-        self._weight_difficulty = float(value)
+        self._weight_difficulty = _validate_weight(value, "Waga trudności musi być liczbą od 0 do 1.")
 
     @property
     def weight_length(self) -> float:
@@ -168,9 +264,7 @@ class UserPreference:
 
     @weight_length.setter  # Poprawiono błąd w nazwie settera
     def weight_length(self, value: float):
-        if not isinstance(value, (int, float)) or not (0 <= value <= 1):
-            raise ValueError("Waga długości musi być liczbą od 0 do 1.")
-        self._weight_length = float(value)
+        self._weight_length = _validate_weight(value, "Waga długości musi być liczbą od 0 do 1.")
 
     @property
     def weight_rating(self) -> float:  # Przywrócono property weight_rating
@@ -178,9 +272,7 @@ class UserPreference:
 
     @weight_rating.setter  # Przywrócono setter weight_rating
     def weight_rating(self, value: float):
-        if not isinstance(value, (int, float)) or not (0 <= value <= 1):
-            raise ValueError("Waga oceny musi być liczbą od 0 do 1.")
-        self._weight_rating = float(value)
+        self._weight_rating = _validate_weight(value, "Waga oceny musi być liczbą od 0 do 1.")
 
     @property
     def preferred_time_range(self) -> str:
@@ -188,9 +280,79 @@ class UserPreference:
 
     @preferred_time_range.setter
     def preferred_time_range(self, value: str):
-        if value not in TIME_RANGES:
-            raise ValueError(f"Nieznany preferowany zakres czasu: {value}. Dopuszczalne: {list(TIME_RANGES.keys())}")
-        self._preferred_time_range = value
+        self._preferred_time_range = _validate_time_range(value)
+
+    @property
+    def walking_speed_kmh(self) -> float | None:
+        return self._walking_speed_kmh
+
+    @walking_speed_kmh.setter
+    def walking_speed_kmh(self, value: float | None):
+        self._walking_speed_kmh = _validate_walking_speed(value)
+
+    @property
+    def latitude(self) -> float | None:
+        return self._latitude
+
+    @latitude.setter
+    def latitude(self, value: float | None):
+        self._latitude = _validate_latitude(value)
+
+    @property
+    def longitude(self) -> float | None:
+        return self._longitude
+
+    @longitude.setter
+    def longitude(self, value: float | None):
+        self._longitude = _validate_longitude(value)
+
+    @property
+    def max_distance_km(self) -> float | None:
+        return self._max_distance_km
+
+    @max_distance_km.setter
+    def max_distance_km(self, value: float | None):
+        self._max_distance_km = _validate_max_distance(value)
+
+    @property
+    def has_location_filter(self) -> bool:
+        """Czy trasy mają być ograniczone do promienia max_distance_km od położenia użytkownika."""
+        return self._latitude is not None and self._longitude is not None and self._max_distance_km is not None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'UserPreference':
+        """
+        Tworzy obiekt ze słownika (np. z zapytania JSON). Brakujące pola przyjmują wartości domyślne
+        z __init__, a błędy są takie same jak przy wywołaniu UserPreference(**data).
+        """
+        return cls(**data)
+
+    @classmethod
+    def validate_many(cls, records: list[dict]) -> list[Exception | None]:
+        """
+        Waliduje wiele profili. Dla każdego rekordu zwraca None albo wyjątek, który zgłosiłby
+        UserPreference.from_dict(record) - czyli błąd pierwszego niepoprawnego pola w kolejności z __init__.
+        """
+        errors: list[Exception | None] = []
+        for record in records:
+            try:
+                cls.from_dict(record)
+            except Exception as e:
+                errors.append(e)
+            else:
+                errors.append(None)
+        return errors
+
+    @classmethod
+    def from_records(cls, records: list[dict]) -> list['UserPreference']:
+        """
+        Tworzy wiele obiektów naraz. Jeśli którykolwiek rekord jest niepoprawny, zgłaszany jest błąd
+        pierwszego z nich (ten sam, co przy pojedynczym tworzeniu).
+        """
+        for error in cls.validate_many(records):
+            if error is not None:
+                raise error
+        return [cls.from_dict(record) for record in records]
 
     def get_weights(self) -> dict:
         """Zwraca słownik z wagami dla różnych czynników."""
@@ -201,10 +363,42 @@ class UserPreference:
             'rating': self._weight_rating
         }
 
+    def canonical_key(self) -> tuple:
+        """
+        Zwraca hashowalny klucz preferencji. Klucz składa się z tych samych wartości, których używa filtrowanie
+        i ocena tras, więc preferencje o tym samym kluczu dają ten sam wynik. Wartości suwaków są zaokrąglane
+        do kroku już przy przypisaniu (np. 2.9999 i 3.0 dla oceny dają ten sam klucz), a nazwa miasta nie zależy
+        od wielkości liter, tak jak przy filtrowaniu.
+        """
+        return (
+            self._min_temp,
+            self._max_temp,
+            self._allow_precipitation,
+            self._preferred_difficulty,
+            self._min_length,
+            self._max_length,
+            self._min_rating,
+            self._allow_night_walks,
+            self._preferred_cloud_cover,
+            self._preferred_city.lower(),
+            self._weight_weather,
+            self._weight_difficulty,
+            self._weight_length,
+            self._weight_rating,
+            self._preferred_time_range,
+            self._walking_speed_kmh,
+            self._latitude,
+            self._longitude,
+            self._max_distance_km
+        )
+
     def __repr__(self):
         return (f"UserPreference(MinTemp: {self._min_temp}, MaxTemp: {self._max_temp}, "
                 f"AllowPrecip: {self._allow_precipitation}, Difficulty: '{self._preferred_difficulty}', "
                 f"MinLength: {self._min_length}, MaxLength: {self._max_length}, "
                 f"MinRating: {self._min_rating}, NightWalks: {self._allow_night_walks}, " 
                 f"CloudCover: '{self._preferred_cloud_cover}', City: '{self._preferred_city}', "
-                f"TimeRange: '{self._preferred_time_range}', Weights: {self.get_weights()})")
\ No newline at end of file
+                f"TimeRange: '{self._preferred_time_range}', WalkingSpeed: {self._walking_speed_kmh}, "
+                f"Location: ({self._latitude}, {self._longitude}), MaxDistance: {self._max_distance_km}, "
+                f"Weights: {self.get_weights()})")
+
@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+
+from src.models.user_preference import UserPreference
+from src.models.weather_data import WeatherData
+from src.utils.constants import CLOUD_COVER_PREFERENCES, COMFORT_MODEL_WEIGHTS, COMFORT_BLOCK_HOURS
+
+# Zmienne godzinowe dostępne dla składników modelu - nazwy jak atrybuty WeatherData i pola archiwum prognoz
+WEATHER_VARIABLES = ("temperature", "precipitation_probability", "precipitation_amount", "sunshine_duration",
+                     "cloud_cover")
+
+
+def forecast_to_arrays(weather_hours: list[WeatherData]) -> dict[str, np.ndarray]:
+    """
+    Zamienia listę godzin prognozy na kolumny numpy: po jednej tablicy na zmienną z WEATHER_VARIABLES
+    oraz "hour" (godzina) i "day" (numer dnia od 1970-01-01) w strefie czasowej znaczników czasu.
+    """
+    arrays = {name: np.array([getattr(hour, name) for hour in weather_hours], dtype=np.float64)
+              for name in WEATHER_VARIABLES}
+    timestamps = pd.DatetimeIndex([hour.timestamp for hour in weather_hours])
+    if timestamps.tz is not None:
+        # Czas lokalny strefy znacznika, tak jak w timestamp.hour i timestamp.date()
+        timestamps = timestamps.tz_localize(None)
+    arrays["hour"] = np.asarray(timestamps.hour, dtype=np.int64)
+    arrays["day"] = timestamps.to_numpy().astype("datetime64[D]").astype(np.int64)
+    return arrays
+
+
+class ComfortKernel(ABC):
+    """
+    Składnik indeksu komfortu liczony wektorowo dla całych tablic prognozy.
+
+    score() dostaje fragment prognozy (słownik zmienna -> tablica, wszystkie tej samej długości) i zwraca
+    tablicę wyników 0-100 dla każdej godziny. Nowe czynniki (np. wiatr) dodaje się jako podklasy
+    i rejestruje w ComfortModel z wagą.
+    """
+
+    # Nazwa składnika, pod którą występuje w COMFORT_MODEL_WEIGHTS
+    name: str = ""
+    # Zmienne prognozy wymagane przez składnik
+    variables: tuple[str, ...] = ()
+
+    @abstractmethod
+    def score(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        pass
+
+
+class TemperatureKernel(ComfortKernel):
+    """100 w preferowanym zakresie temperatur, poza nim -10 pkt za każdy stopień od najbliższej granicy."""
+
+    name = "temperature"
+    variables = ("temperature",)
+
+    def score(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        temperature = weather["temperature"]
+        temp_diff = np.minimum(np.abs(temperature - preferences.min_temp), np.abs(temperature - preferences.max_temp))
+        in_range = (preferences.min_temp <= temperature) & (temperature <= preferences.max_temp)
+        return np.where(in_range, 100.0, np.maximum(0.0, 100 - temp_diff * 10))
+
+
+class PrecipitationKernel(ComfortKernel):
+    """Bez opadów 100; przy opadach 0, jeśli użytkownik ich nie akceptuje, w przeciwnym razie -20 pkt za każdy mm."""
+
+    name = "precipitation"
+    variables = ("precipitation_amount",)
+
+    def score(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        amount = weather["precipitation_amount"]
+        if not preferences.allow_precipitation:
+            return np.where(amount > 0, 0.0, 100.0)
+        return np.where(amount > 0, np.maximum(0.0, 100 - amount * 20), 100.0)
+
+
+class CloudCoverKernel(ComfortKernel):
+    """100, jeśli zachmurzenie mieści się w preferowanym zakresie, w przeciwnym razie 50."""
+
+    name = "cloud_cover"
+    variables = ("cloud_cover",)
+
+    def score(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        cloud_cover = weather["cloud_cover"]
+        low, high = CLOUD_COVER_PREFERENCES[preferences.preferred_cloud_cover]
+        return np.where((low <= cloud_cover) & (cloud_cover <= high), 100.0, 50.0)
+
+
+class SunshineKernel(ComfortKernel):
+    """Udział słońca w godzinie (sunshine_duration w sekundach) w skali 0-100."""
+
+    name = "sunshine"
+    variables = ("sunshine_duration",)
+
+    def score(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        return np.clip(weather["sunshine_duration"] / 36, 0.0, 100.0)
+
+
+class PrecipitationProbabilityKernel(ComfortKernel):
+    """
+    Ryzyko opadów: 100 minus prawdopodobieństwo opadów. Dla użytkowników akceptujących opady
+    kara jest o połowę mniejsza.
+    """
+
+    name = "precipitation_probability"
+    variables = ("precipitation_probability",)
+
+    def score(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        probability = np.clip(weather["precipitation_probability"], 0.0, 100.0)
+        if preferences.allow_precipitation:
+            return 100 - probability / 2
+        return 100 - probability
+
+
+# Składniki dostępne z nazwy (np. w COMFORT_MODEL_WEIGHTS)
+COMFORT_KERNELS: dict[str, type[ComfortKernel]] = {
+    kernel.name: kernel for kernel in (TemperatureKernel, PrecipitationKernel, CloudCoverKernel, SunshineKernel,
+                                       PrecipitationProbabilityKernel)
+}
+
+
+class ComfortModel:
+    """
+    Indeks komfortu (0-100) jako średnia ważona składników ComfortKernel.
+
+    Domyślne wagi (COMFORT_MODEL_WEIGHTS) odtwarzają dotychczasową formułę: średnią z temperatury,
+    opadów i zachmurzenia. Składniki o wadze 0 są pomijane.
+
+    evaluate() przetwarza prognozę blokami po block_hours godzin. Dla każdego bloku liczone są wszystkie
+    składniki i od razu dodawane do wyniku, więc tablice pośrednie mieszczą się w pamięci podręcznej
+    procesora, a dane prognozy są czytane z pamięci raz - kolejny składnik nie oznacza kolejnego
+    przejścia po całej prognozie.
+    """
+
+    def __init__(self, weights: dict[str, float] | None = None, block_hours: int = COMFORT_BLOCK_HOURS):
+        """
+        Args:
+            weights (dict): Nazwa składnika z COMFORT_KERNELS -> waga. Domyślnie COMFORT_MODEL_WEIGHTS.
+            block_hours (int): Liczba godzin prognozy przetwarzana w jednym bloku.
+        """
+        if block_hours <= 0:
+            raise ValueError("Rozmiar bloku musi być liczbą dodatnią.")
+        self._block_hours = block_hours
+        self._kernels: list[tuple[ComfortKernel, float]] = []
+        for name, weight in (weights if weights is not None else COMFORT_MODEL_WEIGHTS).items():
+            if name not in COMFORT_KERNELS:
+                raise ValueError(f"Nieznany składnik modelu komfortu: '{name}'.")
+            self.register(COMFORT_KERNELS[name](), weight)
+
+    @property
+    def weights(self) -> dict[str, float]:
+        return {kernel.name: weight for kernel, weight in self._kernels}
+
+    def register(self, kernel: ComfortKernel, weight: float = 1.0):
+        """Dodaje składnik z podaną wagą (lub zmienia wagę składnika o tej samej nazwie)."""
+        if weight < 0:
+            raise ValueError("Waga składnika modelu komfortu nie może być ujemna.")
+        self._kernels = [(existing, w) for existing, w in self._kernels if existing.name != kernel.name]
+        if weight > 0:
+            self._kernels.append((kernel, weight))
+
+    def unregister(self, name: str):
+        self._kernels = [(kernel, weight) for kernel, weight in self._kernels if kernel.name != name]
+
+    def evaluate(self, weather: dict[str, np.ndarray], preferences: UserPreference) -> np.ndarray:
+        """
+        Zwraca godzinowy indeks komfortu (0-100) dla tablic prognozy (np. z forecast_to_arrays).
+        """
+        if not self._kernels:
+            raise ValueError("Model komfortu nie ma żadnego składnika.")
+        missing = {variable for kernel, _ in self._kernels for variable in kernel.variables} - weather.keys()
+        if missing:
+            raise ValueError(f"Brak danych prognozy wymaganych przez model komfortu: {', '.join(sorted(missing))}.")
+
+        length = len(next(iter(weather.values()))) if weather else 0
+        total_weight = sum(weight for _, weight in self._kernels)
+        comfort = np.empty(length)
+        for start in range(0, length, self._block_hours):
+            end = min(start + self._block_hours, length)
+            block = {name: values[start:end] for name, values in weather.items()}
+            accumulated = np.zeros(end - start)
+            for kernel, weight in self._kernels:
+                accumulated += weight * kernel.score(block, preferences)
+            comfort[start:end] = accumulated / total_weight
+        return comfort
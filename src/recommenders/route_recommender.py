@@ -1,21 +1,38 @@
 import datetime
-from typing import List, Dict, Any
-from collections import defaultdict
+import heapq
+import threading
+import time
+from typing import List, Dict, Any, Iterator
+from collections import OrderedDict
+
+import numpy as np
 
 from src.models.route import Route
 from src.models.user_preference import UserPreference
-from src.models.weather_data import WeatherData
 from src.data_handlers.route_data_manager import RouteDataManager
 from src.data_handlers.weather_data_manager import WeatherDataManager
-from src.utils.constants import NIGHT_HOURS, CLOUD_COVER_PREFERENCES, COMFORT_COLOR_THRESHOLDS, TRICITY_COORDS, FORECAST_DAYS
+from src.recommenders.comfort_model import ComfortModel, forecast_to_arrays
+from src.recommenders.trip_planner import plan_assignment
+from src.utils.tracing import tracer
+from src.utils.constants import NIGHT_HOURS, COMFORT_COLOR_THRESHOLDS, TRICITY_COORDS, FORECAST_DAYS, \
+    RESULT_CACHE_SIZE, WEATHER_CACHE_EXPIRE_SECONDS, DEFAULT_TOP_K, STREAM_CHUNK_SIZE
 
 class RouteRecommender:
-    def __init__(self, route_manager: RouteDataManager, weather_manager: WeatherDataManager):
+    def __init__(self, route_manager: RouteDataManager, weather_manager: WeatherDataManager,
+                 comfort_model: ComfortModel | None = None):
         """
         Inicjalizuje recommender z dostępem do managerów danych.
+        comfort_model określa składniki i wagi indeksu komfortu (domyślnie COMFORT_MODEL_WEIGHTS).
         """
         self._route_manager = route_manager
         self._weather_manager = weather_manager
+        self._comfort_model = comfort_model if comfort_model is not None else ComfortModel()
+
+        # Pamięć podręczna LRU wyników: (klucz preferencji, wersja prognoz, dzień) -> (czas, preferencje, wyniki).
+        # Zmiany katalogu tras unieważniają tylko wpisy, których dotyczą - zob. _on_catalogue_changed
+        self._result_cache: OrderedDict[tuple, tuple[float, UserPreference, List[Dict[str, Any]]]] = OrderedDict()
+        self._result_cache_lock = threading.Lock()
+        self._route_manager.add_change_listener(self._on_catalogue_changed)
         print("RouteRecommender initialized.")
 
     def filter_routes(self, preferences: UserPreference) -> List[Route]:
@@ -25,105 +42,341 @@ class RouteRecommender:
         print("\n--- Rozpoczęcie filtrowania tras ---")
         print(f"Preferencje użytkownika: {preferences}")
 
-        all_routes = self._route_manager.routes
-        filtered_routes = []
-        seen_names = set()
+        all_routes, features = self._route_manager.snapshot()
+        indices = self._filter_route_indices(preferences, all_routes, features)
+        filtered_routes = [all_routes[index] for index in indices]
+
+        print(f"Znaleziono {len(filtered_routes)} unikalnych tras po filtracji.")
+        return filtered_routes
+
+    @staticmethod
+    def _filter_route_indices(preferences: UserPreference, all_routes: List[Route], features,
+                              rows: slice = slice(None), seen_names: set | None = None) -> np.ndarray:
+        """
+        Zwraca indeksy (w all_routes) tras z zakresu rows pasujących do preferencji, pomijając trasy
+        o nazwach już widzianych. seen_names jest uzupełniane o nowe nazwy. all_routes i features
+        muszą pochodzić z tej samej wersji katalogu (RouteDataManager.snapshot()).
+        """
+        offset = rows.start or 0
+        seen_names = set() if seen_names is None else seen_names
+        indices = []
 
-        for route in all_routes:
+        for index in np.flatnonzero(features.match_mask(preferences, rows)) + offset:
+            route = all_routes[index]
             if route.name in seen_names:
                 continue
 
-            if self._route_manager.check_route_match_preferences(route, preferences):
-                filtered_routes.append(route)
-                seen_names.add(route.name)
+            indices.append(index)
+            seen_names.add(route.name)
+        return np.array(indices, dtype=np.int64)
 
-        print(f"Znaleziono {len(filtered_routes)} unikalnych tras po filtracji.")
-        return filtered_routes
+    def _calendar_for_location(self, route: Route, preferences: UserPreference,
+                               calendars_by_location: dict) -> List[Dict[str, Any]]:
+        """Kalendarz zależy tylko od lokalizacji trasy, więc w ramach jednego zapytania liczymy go raz na lokalizację."""
+        coords = self._route_coords(route)
+        location = (coords['latitude'], coords['longitude'])
+        if location not in calendars_by_location:
+            with tracer.span("comfort_calendar", "recommender", region=route.region):
+                calendars_by_location[location] = self.calculate_daily_comfort_for_route(route, preferences)
+        return calendars_by_location[location]
+
+    @staticmethod
+    def _weather_factor(daily_comfort: List[Dict[str, Any]]) -> float:
+        """Średni komfort z kalendarza w skali 0-1."""
+        if not daily_comfort:
+            return 0.0
+        return sum(day["score"] for day in daily_comfort) / (100 * len(daily_comfort))
+
+    def _result_cache_key(self, preferences: UserPreference) -> tuple:
+        return preferences.canonical_key(), self._weather_manager.forecast_version, datetime.date.today()
 
-    def _calculate_hourly_comfort(self, weather_hour: WeatherData, preferences: UserPreference) -> float:
+    def _get_cached_result(self, key: tuple) -> List[Dict[str, Any]] | None:
+        with self._result_cache_lock:
+            entry = self._result_cache.get(key)
+            if entry is None:
+                return None
+            created_at, _, recommendations = entry
+            # Prognoza w pamięci mogła się przedawnić bez zmiany wersji - wtedy liczymy wyniki od nowa
+            if time.time() - created_at > WEATHER_CACHE_EXPIRE_SECONDS:
+                del self._result_cache[key]
+                return None
+            self._result_cache.move_to_end(key)
+            return recommendations
+
+    def _store_result(self, key: tuple, preferences: UserPreference, recommendations: List[Dict[str, Any]],
+                      catalogue_version: int):
+        with self._result_cache_lock:
+            # Katalog zmienił się w trakcie obliczeń - wyniki mogą być nieaktualne, więc ich nie zapamiętujemy
+            if catalogue_version != self._route_manager.catalogue_version:
+                return
+            # Wpisy ze starszymi wersjami prognoz nie zostaną już trafione - usuwamy je od razu
+            stale_keys = [cached_key for cached_key in self._result_cache if cached_key[1:] != key[1:]]
+            for stale_key in stale_keys:
+                del self._result_cache[stale_key]
+            self._result_cache[key] = (time.time(), preferences, recommendations)
+            self._result_cache.move_to_end(key)
+            while len(self._result_cache) > RESULT_CACHE_SIZE:
+                self._result_cache.popitem(last=False)
+
+    def _on_catalogue_changed(self, changes: dict):
         """
-        Oblicza indeks komfortu (0-100) dla pojedynczej godziny na podstawie preferencji.
+        Usuwa z pamięci podręcznej tylko wyniki, na które zmiana katalogu mogła wpłynąć: zawierające usuniętą
+        lub zmienioną trasę albo takie, do których preferencji pasuje nowa lub zmieniona trasa.
         """
+        removed_ids = {route.id for route in changes["deleted"]} | {old.id for old, _ in changes["updated"]}
+        candidates = list(changes["inserted"]) + [new for _, new in changes["updated"]]
+        with self._result_cache_lock:
+            affected_keys = [
+                key for key, (_, preferences, recommendations) in self._result_cache.items()
+                if any(item["route"].id in removed_ids for item in recommendations)
+                or any(self._route_manager.check_route_match_preferences(route, preferences) for route in candidates)
+            ]
+            for key in affected_keys:
+                del self._result_cache[key]
+        if affected_keys:
+            print(f"Unieważniono {len(affected_keys)} wyników w pamięci podręcznej po zmianie katalogu tras.")
+
+    @property
+    def comfort_model(self) -> ComfortModel:
+        return self._comfort_model
+
+    def set_comfort_model(self, comfort_model: ComfortModel):
+        """Zmienia model komfortu; zapamiętane wyniki liczone starym modelem są usuwane."""
+        self._comfort_model = comfort_model
+        self.clear_result_cache()
 
+    def clear_result_cache(self):
+        with self._result_cache_lock:
+            self._result_cache.clear()
+
+    def recommend(self, preferences: UserPreference) -> List[Dict[str, Any]]:
         """
-        Jeśli temperatura mieści się w widełkach preferowanych przez użytkownika 
-        (np. między 15°C a 25°C), wynik pozostaje 100.
-        Jeśli temperatura wykracza poza ten zakres, wynik jest karany. 
-        Obliczana jest różnica (temp_diff) między faktyczną temperaturą a najbliższą granicą widełek.
-        Za każdy 1 stopień Celsjusza tej różnicy, od wyniku odejmowane jest 10 punktów.
-        Funkcja max() zapewnia, że wynik nie spadnie poniżej zera.
+        Zwraca trasy spełniające preferencje posortowane malejąco według oceny, razem z kalendarzem komfortu.
+
+        Każdy element to słownik {"route": Route, "score": float, "calendar": [...]}, gdzie calendar ma format
+        calculate_daily_comfort_for_route. Wyniki są zapamiętywane dla kanonicznego klucza preferencji
+        i unieważniane po zmianie prognoz lub zmianie katalogu tras, która ich dotyczy. Zwracanej listy
+        nie należy modyfikować.
         """
-        temp_score = 100.0
-        if not (preferences.min_temp <= weather_hour.temperature <= preferences.max_temp):
-            temp_diff = min(abs(weather_hour.temperature - preferences.min_temp),
-                            abs(weather_hour.temperature - preferences.max_temp))
-            temp_score = max(0, 100 - temp_diff * 10)
+        with tracer.span("recommend", "recommender") as span:
+            cached = self._get_cached_result(self._result_cache_key(preferences))
+            span.set(cache_hit=cached is not None)
+            if cached is not None:
+                print(f"Zwrócono {len(cached)} tras z pamięci podręcznej wyników.")
+                span.set(routes=len(cached))
+                return cached
+
+            recommendations = self._compute_recommendations(preferences)
+            span.set(routes=len(recommendations))
+            return recommendations
+
+    def _compute_recommendations(self, preferences: UserPreference) -> List[Dict[str, Any]]:
+        catalogue_version = self._route_manager.catalogue_version
+        all_routes, features = self._route_manager.snapshot()
+        with tracer.span("filter", "recommender") as span:
+            indices = self._filter_route_indices(preferences, all_routes, features)
+            span.set(routes=len(indices))
+        print(f"Znaleziono {len(indices)} unikalnych tras po filtracji.")
+
+        with tracer.span("score", "recommender", routes=len(indices)):
+            static_scores, weather_share = features.static_scores(preferences, indices)
+            calendars_by_location = {}
+            recommendations = []
+            for index, static_score in zip(indices, static_scores):
+                route = all_routes[index]
+                calendar = self._calendar_for_location(route, preferences, calendars_by_location)
+                recommendations.append({
+                    "route": route,
+                    "score": float(static_score + weather_share * self._weather_factor(calendar)),
+                    "calendar": calendar
+                })
 
+        recommendations.sort(key=lambda item: item["score"], reverse=True)
+        # Pusty kalendarz oznacza nieudane pobranie prognozy - takiego wyniku nie zapamiętujemy, bo wersja prognoz
+        # się nie zmieniła i ranking bez pogody byłby zwracany także po przywróceniu dostępu do API
+        if all(calendars_by_location.values()):
+            # Klucz wyznaczamy ponownie - obliczenia mogły pobrać nowe prognozy i zmienić ich wersję
+            self._store_result(self._result_cache_key(preferences), preferences, recommendations, catalogue_version)
+        return recommendations
+
+    def iter_recommendations(self, preferences: UserPreference, k: int = DEFAULT_TOP_K,
+                             chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[List[Dict[str, Any]]]:
         """
-        Jeśli użytkownik zaznaczył, że nie akceptuje opadów, 
-        a prognoza przewiduje jakiekolwiek opady (precipitation_amount > 0),
-        wynik jest natychmiast zerowany (precip_score = 0.0).
-        Jeśli użytkownik akceptuje opady, ale one występują, wynik jest stopniowo karany. 
-        Za każdy 1 mm opadu na godzinę, od wyniku odejmowane jest 20 punktów.
+        Przetwarza katalog porcjami po chunk_size tras i po każdej porcji, która zmieniła ranking,
+        zwraca aktualną listę k najlepszych tras (w formacie recommend()).
+
+        Dla każdej porcji liczona jest górna granica oceny (część niezależna od pogody plus najlepszy
+        możliwy czynnik pogodowy). Porcje, które nie mogą pobić k-tej najlepszej trasy, są pomijane bez
+        pobierania prognoz. W pamięci trzymane jest tylko k wyników i bieżąca porcja.
         """
-        precip_score = 100.0
-        if not preferences.allow_precipitation and weather_hour.precipitation_amount > 0:
-            precip_score = 0.0
-        elif weather_hour.precipitation_amount > 0:
-            precip_score = max(0, 100 - weather_hour.precipitation_amount * 20)
+        if not isinstance(k, int) or k <= 0:
+            raise ValueError("Liczba zwracanych tras musi być dodatnią liczbą całkowitą.")
+        if not isinstance(chunk_size, int) or chunk_size <= 0:
+            raise ValueError("Rozmiar porcji musi być dodatnią liczbą całkowitą.")
+
+        all_routes, features = self._route_manager.snapshot()
+        calendars_by_location = {}
+        weather_factors_by_region = {}
+        seen_names = set()
+        top_k = []  # kopiec (ocena, -indeks, indeks) - na szczycie najsłabsza z k najlepszych tras
 
+        for start in range(0, len(all_routes), chunk_size):
+            indices = self._filter_route_indices(preferences, all_routes, features,
+                                                 slice(start, start + chunk_size), seen_names)
+            if len(indices) == 0:
+                continue
+
+            static_scores, weather_share = features.static_scores(preferences, indices)
+            # Dla regionów bez policzonego jeszcze kalendarza zakładamy najlepszą możliwą pogodę
+            best_weather = np.array([weather_factors_by_region.get(all_routes[index].region, 1.0)
+                                     for index in indices])
+            upper_bounds = static_scores + weather_share * best_weather
+            threshold = top_k[0][0] if len(top_k) == k else -1.0
+            if upper_bounds.max() <= threshold:
+                continue
+
+            changed = False
+            for index, static_score, upper_bound in zip(indices, static_scores, upper_bounds):
+                if upper_bound <= threshold:
+                    continue
+                route = all_routes[index]
+                calendar = self._calendar_for_location(route, preferences, calendars_by_location)
+                weather_factor = self._weather_factor(calendar)
+                weather_factors_by_region[route.region] = weather_factor
+                score = float(static_score + weather_share * weather_factor)
+
+                entry = (score, -int(index), int(index))
+                if len(top_k) < k:
+                    heapq.heappush(top_k, entry)
+                elif entry > top_k[0]:
+                    heapq.heapreplace(top_k, entry)
+                else:
+                    continue
+                changed = True
+                threshold = top_k[0][0] if len(top_k) == k else -1.0
+
+            if changed:
+                yield [{
+                    "route": all_routes[index],
+                    "score": score,
+                    "calendar": self._calendar_for_location(all_routes[index], preferences, calendars_by_location)
+                } for score, _, index in sorted(top_k, reverse=True)]
+
+    def plan_trip(self, preferences: UserPreference, days: int | List[datetime.date],
+                  max_total_hours: float | None = None,
+                  min_day_comfort: float | None = None) -> List[Dict[str, Any]]:
         """
-        Najpierw z pliku constants.py pobierany jest preferowany przez użytkownika zakres zachmurzenia
-        (np. dla "troche_chmur" jest to przedział 30-70%).
-        Jeśli faktyczne zachmurzenie wykracza poza ten zakres, wynik jest redukowany do stałej wartości 50.0. 
-        Albo warunek jest spełniony (100 pkt), albo nie (50 pkt).
+        Układa plan wycieczek: każdemu dniu przydziela inną trasę spełniającą preferencje albo odpoczynek.
+
+        days to liczba kolejnych dni od dzisiaj albo lista konkretnych dat (w zakresie prognozy).
+        Użyteczność trasy w danym dniu liczona jest jak ocena w recommend(), ale z komfortem tego jednego dnia
+        zamiast średniej z kalendarza. Plan maksymalizuje sumę użyteczności, przy czym łączny szacowany czas
+        przejścia nie przekracza max_total_hours, a dni z komfortem poniżej min_day_comfort (0-100) nie są
+        przydzielane danej trasie. Przydział liczony jest algorytmem węgierskim (zob. trip_planner).
+
+        Zwraca listę słowników {"date", "route" (None = odpoczynek), "score", "comfort", "hours"} w kolejności dat.
         """
-        cloud_score = 100.0
-        pref_cloud_range = CLOUD_COVER_PREFERENCES[preferences.preferred_cloud_cover]
-        if not (pref_cloud_range[0] <= weather_hour.cloud_cover <= pref_cloud_range[1]):
-            cloud_score = 50.0
+        today = datetime.date.today()
+        if isinstance(days, int):
+            if days <= 0:
+                raise ValueError("Liczba dni wycieczki musi być dodatnią liczbą całkowitą.")
+            dates = [today + datetime.timedelta(days=offset) for offset in range(days)]
+        else:
+            dates = sorted(set(days))
+        outside = [day for day in dates if not (0 <= (day - today).days < FORECAST_DAYS)]
+        if outside:
+            raise ValueError(f"Prognoza nie obejmuje dni: {[day.isoformat() for day in outside]}.")
 
-        final_comfort = (temp_score + precip_score + cloud_score) / 3
-        return final_comfort
+        all_routes, features = self._route_manager.snapshot()
+        indices = self._filter_route_indices(preferences, all_routes, features)
+        static_scores, weather_share = features.static_scores(preferences, indices)
+        hours = features.estimated_time_hours(preferences.walking_speed_kmh, indices)
 
-    def calculate_daily_comfort_for_route(self, route: Route, preferences: UserPreference) -> List[Dict[str, Any]]:
+        # Macierz komfortu dni x trasy; kalendarz liczony raz na lokalizację
+        calendars_by_location = {}
+        comfort = np.zeros((len(dates), len(indices)))
+        for column, index in enumerate(indices):
+            calendar = self._calendar_for_location(all_routes[index], preferences, calendars_by_location)
+            score_by_date = {day["date"]: day["score"] for day in calendar}
+            comfort[:, column] = [score_by_date.get(day, 0) for day in dates]
+
+        utility = static_scores[np.newaxis, :] + weather_share * comfort / 100
+        allowed = comfort >= min_day_comfort if min_day_comfort is not None else None
+        plan = plan_assignment(utility, hours, max_total_hours, allowed)
+
+        trip = []
+        for row, (day, column) in enumerate(zip(dates, plan)):
+            if column < 0:
+                trip.append({"date": day, "route": None, "score": 0.0, "comfort": None, "hours": 0.0})
+                continue
+            trip.append({
+                "date": day,
+                "route": all_routes[indices[column]],
+                "score": float(utility[row, column]),
+                "comfort": int(comfort[row, column]),
+                "hours": float(hours[column])
+            })
+        print(f"Zaplanowano {sum(1 for item in trip if item['route'] is not None)} tras na {len(dates)} dni.")
+        return trip
+
+    def _daily_average_comfort(self, weather: dict[str, np.ndarray],
+                               preferences: UserPreference) -> dict[int, float]:
         """
-        Oblicza średni dzienny komfort dla danej trasy na najbliższe 14 dni.
+        Oblicza średni komfort każdego dnia (numer dnia od 1970-01-01 -> komfort 0-100) dla tablic prognozy,
+        pomijając godziny nocne, jeśli użytkownik ich nie chce. Komfort godzinowy liczy model komfortu
+        dla całej prognozy naraz, a średnie dzienne - jedno zliczenie po dniach.
         """
+        if not len(weather["day"]):
+            return {}
+        comfort = self._comfort_model.evaluate(weather, preferences)
+        keep = np.ones(len(comfort), dtype=bool)
+        if not preferences.allow_night_walks:
+            keep = ~np.isin(weather["hour"], NIGHT_HOURS)
+
+        days, day_index = np.unique(weather["day"][keep], return_inverse=True)
+        sums = np.bincount(day_index, weights=comfort[keep], minlength=len(days))
+        counts = np.bincount(day_index, minlength=len(days))
+        return dict(zip(days.tolist(), (sums / counts).tolist()))
+
+    @staticmethod
+    def _day_number(day: datetime.date) -> int:
+        return (day - datetime.date(1970, 1, 1)).days
+
+    @staticmethod
+    def _comfort_color(avg_comfort: float) -> str:
+        if avg_comfort >= COMFORT_COLOR_THRESHOLDS['green']:
+            return '#2E8B57'
+        elif avg_comfort >= COMFORT_COLOR_THRESHOLDS['yellow']:
+            return '#FFD700'
+        elif avg_comfort >= COMFORT_COLOR_THRESHOLDS['orange']:
+            return '#FFA500'
+        return '#DC143C'
+
+    @staticmethod
+    def _route_coords(route: Route) -> dict:
         coords = TRICITY_COORDS.get(route.region)
         if not coords:
             coords = TRICITY_COORDS["Trójmiasto"]
+        return coords
 
+    def calculate_daily_comfort_for_route(self, route: Route, preferences: UserPreference) -> List[Dict[str, Any]]:
+        """
+        Oblicza średni dzienny komfort dla danej trasy na najbliższe 14 dni.
+        """
+        coords = self._route_coords(route)
         weather_forecast = self._weather_manager.get_weather_for_location(coords['latitude'], coords['longitude'])
         if not weather_forecast:
             return []
 
 
-        daily_weather = defaultdict(list)
-        for hour_data in weather_forecast:
-            daily_weather[hour_data.timestamp.date()].append(hour_data)
+        with tracer.span("comfort_model", "recommender", hours=len(weather_forecast)):
+            comfort_by_day = self._daily_average_comfort(forecast_to_arrays(weather_forecast), preferences)
 
         daily_comfort_scores = []
         for i in range(FORECAST_DAYS):
             day = datetime.date.today() + datetime.timedelta(days=i)
-            hourly_comforts_for_day = []
-            if day in daily_weather:
-                for weather_hour in daily_weather[day]:
-                    if weather_hour.timestamp.hour in NIGHT_HOURS and not preferences.allow_night_walks:
-                        continue
-                    hourly_comforts_for_day.append(self._calculate_hourly_comfort(weather_hour, preferences))
-
-            avg_comfort = sum(hourly_comforts_for_day) / len(hourly_comforts_for_day) if hourly_comforts_for_day else 0
-
-            color = "#333333" # Ciemnoszary domyślny
-            if avg_comfort >= COMFORT_COLOR_THRESHOLDS['green']:
-                color = '#2E8B57'
-            elif avg_comfort >= COMFORT_COLOR_THRESHOLDS['yellow']:
-                color = '#FFD700'
-            elif avg_comfort >= COMFORT_COLOR_THRESHOLDS['orange']:
-                color = '#FFA500'
-            else:
-                color = '#DC143C'
+            avg_comfort = comfort_by_day.get(self._day_number(day), 0)
+            color = self._comfort_color(avg_comfort)
 
             """
             PRZYKŁAD JAK WYGLĄDAJĄ DANE W daily_comfort_score 
@@ -148,4 +401,60 @@ class RouteRecommender:
                 "score": round(avg_comfort),
                 "color": color
             })
-        return daily_comfort_scores
\ No newline at end of file
+        return daily_comfort_scores
+
+    def calculate_historical_comfort_for_route(self, route: Route, preferences: UserPreference,
+                                               start: datetime.date, end: datetime.date) -> List[Dict[str, Any]]:
+        """
+        Oblicza dzienny komfort trasy na podstawie archiwum prognoz dla dni z zakresu [start, end].
+
+        Zwraca listę w tym samym formacie co calculate_daily_comfort_for_route, tylko dla dni obecnych w archiwum.
+        Dane są czytane z dysku dzień po dniu, więc zakres może obejmować wiele miesięcy.
+        """
+        archive = self._weather_manager.archive
+        if archive is None:
+            raise ValueError("Archiwum prognoz nie jest skonfigurowane w WeatherDataManager.")
+
+        coords = self._route_coords(route)
+        daily_comfort_scores = []
+        for day, records in archive.iter_days(coords['latitude'], coords['longitude'], start, end):
+            avg_comfort = self._daily_average_comfort(archive.records_to_arrays(records), preferences).get(
+                self._day_number(day), 0)
+            daily_comfort_scores.append({
+                "date": day,
+                "score": round(avg_comfort),
+                "color": self._comfort_color(avg_comfort)
+            })
+        return daily_comfort_scores
+
+    def rank_routes_by_comfortable_days(self, preferences: UserPreference, start: datetime.date,
+                                        end: datetime.date,
+                                        min_score: float = COMFORT_COLOR_THRESHOLDS['green']) -> List[Dict[str, Any]]:
+        """
+        Odpowiada na pytanie "które trasy miały najwięcej komfortowych dni w danym okresie".
+
+        Trasy spełniające preferencje są sortowane malejąco według liczby dni z archiwum,
+        których komfort wynosił co najmniej min_score. Komfort liczony jest raz na lokalizację.
+
+        Prognozy są pobierane i archiwizowane dla środka miasta trasy (_route_coords), więc wszystkie trasy
+        z jednego miasta mają tę samą liczbę dni - w praktyce jest to ranking miast. Wewnątrz miasta trasy
+        zachowują kolejność z filter_routes().
+        """
+        comfortable_days_by_location = {}
+        results = []
+        for route in self.filter_routes(preferences):
+            coords = self._route_coords(route)
+            location = (coords['latitude'], coords['longitude'])
+            if location not in comfortable_days_by_location:
+                history = self.calculate_historical_comfort_for_route(route, preferences, start, end)
+                comfortable_days_by_location[location] = (
+                    sum(1 for day in history if day["score"] >= min_score), len(history))
+            comfortable_days, archived_days = comfortable_days_by_location[location]
+            results.append({
+                "route": route,
+                "comfortable_days": comfortable_days,
+                "archived_days": archived_days
+            })
+
+        results.sort(key=lambda item: item["comfortable_days"], reverse=True)
+        return results
@@ -0,0 +1,158 @@
+import numpy as np
+
+from src.utils.constants import TRIP_PLANNER_MAX_ITERATIONS
+
+# Koszt przypisania niedozwolonego (np. dzień z komfortem poniżej minimum) - skończony, aby nie psuć arytmetyki
+FORBIDDEN_COST = 1e9
+
+
+def solve_assignment(cost: np.ndarray) -> np.ndarray:
+    """
+    Rozwiązuje prostokątny problem przydziału (algorytm węgierski ze ścieżkami powiększającymi i potencjałami).
+
+    Dla macierzy kosztów n x m (n <= m) zwraca tablicę długości n: kolumnę przydzieloną każdemu wierszowi,
+    tak aby kolumny były różne, a suma kosztów minimalna. Złożoność O(n^2 * m) - pętla po kolumnach
+    jest wektorowa, więc setki kolumn (tras) nie stanowią problemu.
+    """
+    cost = np.asarray(cost, dtype=np.float64)
+    n, m = cost.shape
+    if n > m:
+        raise ValueError("Liczba wierszy nie może przekraczać liczby kolumn.")
+
+    # Indeksy od 1; kolumna 0 to pomocnicza kolumna startowa ścieżki powiększającej
+    u = np.zeros(n + 1)
+    v = np.zeros(m + 1)
+    row_of_column = np.zeros(m + 1, dtype=np.int64)  # 0 = kolumna wolna
+    previous_column = np.zeros(m + 1, dtype=np.int64)
+
+    for row in range(1, n + 1):
+        row_of_column[0] = row
+        column = 0
+        min_slack = np.full(m + 1, np.inf)
+        used = np.zeros(m + 1, dtype=bool)
+        while True:
+            used[column] = True
+            current_row = row_of_column[column]
+            free = ~used[1:]
+            slack = cost[current_row - 1] - u[current_row] - v[1:]
+            improved = free & (slack < min_slack[1:])
+            min_slack[1:][improved] = slack[improved]
+            previous_column[1:][improved] = column
+
+            candidate_slack = np.where(free, min_slack[1:], np.inf)
+            next_column = int(np.argmin(candidate_slack)) + 1
+            delta = candidate_slack[next_column - 1]
+
+            u[row_of_column[used]] += delta
+            v[used] -= delta
+            min_slack[1:][free] -= delta
+
+            column = next_column
+            if row_of_column[column] == 0:
+                break
+
+        # Odwrócenie ścieżki powiększającej
+        while column:
+            previous = previous_column[column]
+            row_of_column[column] = row_of_column[previous]
+            column = previous
+
+    assignment = np.empty(n, dtype=np.int64)
+    for column in np.flatnonzero(row_of_column[1:]) + 1:
+        assignment[row_of_column[column] - 1] = column - 1
+    return assignment
+
+
+def plan_assignment(utility: np.ndarray, hours: np.ndarray, max_total_hours: float | None = None,
+                    allowed: np.ndarray | None = None) -> np.ndarray:
+    """
+    Wybiera dla każdego dnia (wiersz utility) inną trasę (kolumna) lub dzień odpoczynku, maksymalizując
+    sumę użyteczności przy łącznym czasie przejścia nie większym niż max_total_hours.
+
+    Zwraca tablicę długości liczby dni z indeksem trasy albo -1 dla dnia odpoczynku (użyteczność 0).
+    Do macierzy dokładane są kolumny "odpoczynek", po jednej na dzień, więc tras może być mniej niż dni.
+
+    Ograniczenie czasu jest obsługiwane relaksacją Lagrange'a: od użyteczności odejmowana jest kara
+    lambda * godziny, a lambda dobierane jest bisekcją jako najmniejsze, przy którym plan mieści się w limicie.
+    Każdy krok to jedno rozwiązanie problemu przydziału, więc całość pozostaje wielomianowa. Plany z granicy
+    bisekcji są na koniec poprawiane lokalnie (wykorzystanie pozostałego czasu). Wynik zawsze spełnia limit,
+    ale - ponieważ przydział z limitem zasobu jest NP-trudny - nie zawsze jest optymalny.
+    """
+    utility = np.asarray(utility, dtype=np.float64)
+    hours = np.asarray(hours, dtype=np.float64)
+    day_count, route_count = utility.shape
+    if allowed is None:
+        allowed = np.ones(utility.shape, dtype=bool)
+
+    def solve(penalty: float) -> np.ndarray:
+        cost = np.full((day_count, route_count + day_count), FORBIDDEN_COST)
+        cost[:, :route_count] = np.where(allowed, -(utility - penalty * hours), FORBIDDEN_COST)
+        cost[:, route_count:] = 0.0
+        columns = solve_assignment(cost)
+        return np.where(columns < route_count, columns, -1)
+
+    def total_hours(plan: np.ndarray) -> float:
+        return float(hours[plan[plan >= 0]].sum())
+
+    def total_utility(plan: np.ndarray) -> float:
+        days = np.flatnonzero(plan >= 0)
+        return float(utility[days, plan[days]].sum())
+
+    plan = solve(0.0)
+    if max_total_hours is None or total_hours(plan) <= max_total_hours:
+        return plan
+
+    # Przy karze high żadna trasa nie jest opłacalna - plan z samych odpoczynków zawsze mieści się w limicie
+    positive_hours = hours[hours > 0]
+    low, high = 0.0, 1.0
+    if len(positive_hours):
+        high = float(utility.max()) / float(positive_hours.min()) + 1.0
+    feasible_plan, infeasible_plan = np.full(day_count, -1, dtype=np.int64), plan
+    for _ in range(TRIP_PLANNER_MAX_ITERATIONS):
+        penalty = (low + high) / 2
+        candidate = solve(penalty)
+        if total_hours(candidate) <= max_total_hours:
+            high, feasible_plan = penalty, candidate
+        else:
+            low, infeasible_plan = penalty, candidate
+
+    # Luka dualności: poprawiamy oba plany z granicy bisekcji i wybieramy lepszy
+    candidates = [_fill_budget(feasible_plan, utility, hours, max_total_hours, allowed),
+                  _fill_budget(_trim_to_budget(infeasible_plan, utility, hours, max_total_hours),
+                               utility, hours, max_total_hours, allowed)]
+    return max(candidates, key=total_utility)
+
+
+def _trim_to_budget(plan: np.ndarray, utility: np.ndarray, hours: np.ndarray, max_total_hours: float) -> np.ndarray:
+    """Zamienia na odpoczynek dni o najmniejszej użyteczności na godzinę, aż plan zmieści się w limicie."""
+    plan = plan.copy()
+    while hours[plan[plan >= 0]].sum() > max_total_hours:
+        days = np.flatnonzero(plan >= 0)
+        value_per_hour = utility[days, plan[days]] / np.maximum(hours[plan[days]], 1e-9)
+        plan[days[np.argmin(value_per_hour)]] = -1
+    return plan
+
+
+def _fill_budget(plan: np.ndarray, utility: np.ndarray, hours: np.ndarray, max_total_hours: float,
+                 allowed: np.ndarray) -> np.ndarray:
+    """
+    Lokalne ulepszanie planu mieszczącego się w limicie: dopóki to możliwe, zamienia trasę danego dnia
+    (lub odpoczynek) na nieużywaną trasę o większej użyteczności, która nadal mieści się w limicie czasu.
+    """
+    plan = plan.copy()
+    improved = True
+    while improved:
+        improved = False
+        for day in range(len(plan)):
+            current = plan[day]
+            current_utility = utility[day, current] if current >= 0 else 0.0
+            spare_hours = max_total_hours - hours[plan[plan >= 0]].sum() + (hours[current] if current >= 0 else 0.0)
+            usable = allowed[day] & (hours <= spare_hours)
+            usable[plan[plan >= 0]] = False
+            if not usable.any():
+                continue
+            best = int(np.argmax(np.where(usable, utility[day], -np.inf)))
+            if utility[day, best] > current_utility:
+                plan[day] = best
+                improved = True
+    return plan
@@ -0,0 +1,175 @@
+import contextvars
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import requests
+from PIL import Image, ImageOps
+
+from src.utils.tracing import tracer
+from src.utils.constants import THUMBNAIL_SIZE, IMAGE_DECODE_WORKERS, IMAGE_DOWNLOAD_WORKERS, \
+    IMAGE_CACHE_MAX_BYTES, IMAGE_DOWNLOAD_TIMEOUT_SECONDS
+
+
+def decode_thumbnail(data: bytes, size: tuple[int, int]) -> tuple[str, tuple[int, int], bytes]:
+    """
+    Dekoduje zdjęcie i zmniejsza je do dokładnie podanego rozmiaru (kadrowanie do proporcji miniatury).
+
+    Dla plików JPEG Image.draft() pozwala dekoderowi od razu pominąć część pikseli (skala 1/2, 1/4, 1/8),
+    a Image.reduce() szybko zmniejsza obraz o całkowitą krotność przed właściwym skalowaniem.
+    Zwraca (tryb, rozmiar, surowe piksele) - zwarty bufor, który można przesłać między procesami.
+    Funkcja działa w procesach roboczych, więc nie może korzystać z tkinter.
+    """
+    image = Image.open(BytesIO(data))
+    # Skala dekodowania dobrana tak, aby obraz pokrył całą miniaturę (draft nie zejdzie poniżej podanego rozmiaru)
+    cover_scale = max(size[0] / image.width, size[1] / image.height)
+    image.draft("RGB", (round(image.width * cover_scale), round(image.height * cover_scale)))
+
+    factor = int(min(image.width / size[0], image.height / size[1]) // 2)
+    if factor > 1:
+        image = image.reduce(factor)
+
+    image = ImageOps.fit(image.convert("RGB"), size, method=Image.Resampling.LANCZOS)
+    return image.mode, image.size, image.tobytes()
+
+
+class ImagePipeline:
+    """
+    Pobieranie i przygotowywanie miniatur tras poza wątkiem interfejsu.
+
+    Zdjęcia są pobierane w puli wątków (operacje sieciowe), a dekodowanie i zmniejszanie odbywa się
+    w puli procesów, więc nie blokuje interpretera (GIL) i interfejs pozostaje płynny przy wielu kartach.
+    Gotowe miniatury są przechowywane w pamięci podręcznej LRU ograniczonej rozmiarem w bajtach;
+    to samo zdjęcie zamówione kilka razy jest pobierane tylko raz. Zamówienia, które przestały być potrzebne
+    (np. karta trasy została usunięta), zwalnia się przez release() - oczekujące pobranie jest wtedy anulowane.
+    """
+
+    def __init__(self, size: tuple[int, int] = THUMBNAIL_SIZE, decode_workers: int = IMAGE_DECODE_WORKERS,
+                 download_workers: int = IMAGE_DOWNLOAD_WORKERS, cache_max_bytes: int = IMAGE_CACHE_MAX_BYTES):
+        self._size = size
+        self._decode_workers = decode_workers
+        self._cache_max_bytes = cache_max_bytes
+        self._session = requests.Session()
+        self._download_pool = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix="image-download")
+        # Pula procesów tworzona przy pierwszym użyciu; "spawn", bo fork procesu z działającym Tk jest niebezpieczny
+        self._decode_pool: ProcessPoolExecutor | None = None
+        self._closed = False
+
+        self._lock = threading.Lock()
+        self._cache: OrderedDict[str, tuple[str, tuple[int, int], bytes]] = OrderedDict()
+        self._cache_bytes = 0
+        self._inflight: dict[str, Future] = {}
+        # Liczba odbiorców oczekujących na każde pobranie w toku
+        self._waiters: dict[str, int] = {}
+
+    @property
+    def size(self) -> tuple[int, int]:
+        return self._size
+
+    def load(self, url: str) -> Future:
+        """
+        Zwraca Future, którego wynikiem jest gotowa miniatura (PIL.Image o rozmiarze size).
+
+        Wynik z pamięci podręcznej zwracany jest jako już zakończony Future. Callbacki Future wywoływane są
+        w wątkach roboczych - zmiany w interfejsie należy przekazać do wątku UI (np. przez after()).
+        Każde wywołanie load() powinno mieć odpowiadające mu release(), gdy wynik przestaje być potrzebny.
+        """
+        with self._lock:
+            cached = self._cache.get(url)
+            if cached is not None:
+                self._cache.move_to_end(url)
+                with tracer.span("image_cache", "images", url=url, cache_hit=True):
+                    future = Future()
+                    future.set_result(Image.frombytes(*cached))
+                return future
+            if url in self._inflight:
+                self._waiters[url] += 1
+                return self._inflight[url]
+            # Wątki puli nie dziedziczą kontekstu - kopia przenosi numer wyszukiwania do odcinków pobrania
+            future = self._download_pool.submit(contextvars.copy_context().run, self._fetch_and_decode, url)
+            self._inflight[url] = future
+            self._waiters[url] = 1
+        future.add_done_callback(lambda _: self._forget_inflight(url, future))
+        return future
+
+    def release(self, url: str, future: Future):
+        """
+        Informuje, że odbiorca nie czeka już na wynik load(url). Gdy nie zostanie żaden odbiorca,
+        pobranie jeszcze niezaczęte jest anulowane; rozpoczęte kończy się normalnie i trafia do pamięci podręcznej.
+        """
+        with self._lock:
+            if self._inflight.get(url) is not future:
+                return
+            self._waiters[url] -= 1
+            if self._waiters[url] > 0:
+                return
+        future.cancel()
+
+    def _forget_inflight(self, url: str, future: Future):
+        with self._lock:
+            if self._inflight.get(url) is future:
+                del self._inflight[url]
+                del self._waiters[url]
+
+    def stats(self) -> dict:
+        """Stan pamięci potoku: liczba i rozmiar miniatur w pamięci podręcznej oraz liczba pobrań w toku."""
+        with self._lock:
+            return {
+                "cached_images": len(self._cache),
+                "cache_bytes": self._cache_bytes,
+                "cache_max_bytes": self._cache_max_bytes,
+                "pending_loads": len(self._inflight)
+            }
+
+    def _fetch_and_decode(self, url: str) -> Image.Image:
+        with tracer.span("image_download", "images", url=url, cache_hit=False) as span:
+            response = self._session.get(url, timeout=IMAGE_DOWNLOAD_TIMEOUT_SECONDS)
+            response.raise_for_status()
+            span.set(bytes=len(response.content))
+        with tracer.span("image_decode", "images", url=url):
+            buffer = self._decode(response.content)
+        self._store(url, buffer)
+        return Image.frombytes(*buffer)
+
+    def _decode(self, data: bytes) -> tuple[str, tuple[int, int], bytes]:
+        try:
+            return self._get_decode_pool().submit(decode_thumbnail, data, self._size).result()
+        except BrokenProcessPool as e:
+            # Proces roboczy zakończył się awaryjnie - ta miniatura powstaje w bieżącym wątku, a pula zostanie
+            # utworzona od nowa przy następnym zleceniu
+            print(f"Błąd puli procesów dekodujących obrazy, dekodowanie w wątku: {e}")
+            with self._lock:
+                self._decode_pool = None
+            return decode_thumbnail(data, self._size)
+
+    def _get_decode_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Potok miniatur został zamknięty.")
+            if self._decode_pool is None:
+                self._decode_pool = ProcessPoolExecutor(max_workers=self._decode_workers,
+                                                        mp_context=multiprocessing.get_context("spawn"))
+            return self._decode_pool
+
+    def _store(self, url: str, buffer: tuple[str, tuple[int, int], bytes]):
+        with self._lock:
+            if url in self._cache:
+                return
+            self._cache[url] = buffer
+            self._cache_bytes += len(buffer[2])
+            while self._cache_bytes > self._cache_max_bytes and len(self._cache) > 1:
+                _, (_, _, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def shutdown(self):
+        """Zatrzymuje pule wątków i procesów; niezakończone zlecenia są anulowane."""
+        self._download_pool.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._closed = True
+            decode_pool, self._decode_pool = self._decode_pool, None
+        if decode_pool is not None:
+            decode_pool.shutdown(wait=False, cancel_futures=True)
+        self._session.close()
@@ -0,0 +1,126 @@
+from concurrent.futures import Future
+from typing import Callable
+
+import customtkinter as ctk
+
+from src.models.route import Route
+from src.ui.image_pipeline import ImagePipeline
+from src.utils.tracing import tracer
+
+
+class RouteCard:
+    """
+    Karta jednej trasy w wynikach wyszukiwania: miniatura, opis i kalendarz komfortu.
+
+    Karta jest właścicielem swoich widżetów, miniatury (CTkImage) i zamówienia miniatury w ImagePipeline.
+    destroy() zwalnia wszystko naraz: anuluje oczekujące pobranie, odpina obraz od etykiety i usuwa widżety,
+    więc po kolejnych wyszukiwaniach nie zostają w pamięci ani obrazy, ani spóźnione wywołania
+    konfigurujące usunięte etykiety.
+    """
+
+    def __init__(self, parent, route: Route, comfort_data: list[dict], image_pipeline: ImagePipeline,
+                 fonts: dict[str, ctk.CTkFont], format_time: Callable[[float], str],
+                 open_link: Callable[[str], None]):
+        """
+        Args:
+            fonts (dict): Czcionki współdzielone przez wszystkie karty ("title", "day") - tworzenie nowej
+                          CTkFont dla każdej karty rejestruje w Tk kolejną nazwaną czcionkę.
+        """
+        self.route = route
+        self._pipeline = image_pipeline
+        self._image: ctk.CTkImage | None = None
+        self._image_future: Future | None = None
+        self._destroyed = False
+
+        self.frame = ctk.CTkFrame(parent)
+        self.frame.pack(padx=10, pady=10, fill="x")
+
+        top_frame = ctk.CTkFrame(self.frame, fg_color="transparent")
+        top_frame.pack(padx=10, pady=10, fill="x")
+        top_frame.grid_columnconfigure(0, weight=1)
+        top_frame.grid_columnconfigure(1, weight=3)
+
+        self._image_label = ctk.CTkLabel(top_frame, text="Ładowanie...")
+        self._image_label.grid(row=0, column=0, rowspan=2, padx=(0, 10), sticky="nw")
+
+        info_frame = ctk.CTkFrame(top_frame, fg_color="transparent")
+        info_frame.grid(row=0, column=1, sticky="nsew")
+
+        ctk.CTkLabel(info_frame, text=route.name, font=fonts["title"]).pack(anchor="w")
+        ctk.CTkLabel(info_frame,
+                     text=f"Region: {route.region} | Trudność: {route.difficulty.capitalize()} | Ocena: {route.rating} ⭐").pack(
+            anchor="w")
+
+        formatted_time = format_time(route.estimated_time_hours)
+        ctk.CTkLabel(info_frame, text=f"Długość: {route.length_km} km | Szacowany czas: {formatted_time}").pack(
+            anchor="w")
+
+        ctk.CTkButton(info_frame, text="Otwórz w AllTrails", command=lambda u=route.link: open_link(u)).pack(
+            anchor="w", pady=5)
+
+        calendar_frame = ctk.CTkFrame(self.frame)
+        calendar_frame.pack(fill="x", padx=10, pady=(0, 10))
+
+        for i, day_data in enumerate(comfort_data):
+            col = i % 7
+            row = i // 7
+            day_frame = ctk.CTkFrame(calendar_frame, fg_color=day_data['color'])
+            day_frame.grid(row=row, column=col, padx=5, pady=5, sticky="ew")
+
+            ctk.CTkLabel(day_frame, text=day_data['date'].strftime('%d.%m'), font=fonts["day"]).pack()
+            ctk.CTkLabel(day_frame, text=f"{day_data['score']}%").pack()
+            calendar_frame.grid_columnconfigure(col, weight=1)
+
+        self._image_future = self._pipeline.load(route.image_link)
+        # Od zamówienia miniatury do jej wyświetlenia (lub anulowania) - obejmuje kolejkę, pobranie i dekodowanie
+        self._image_span = tracer.start_async("image", "ui", url=route.image_link,
+                                              cache_hit=self._image_future.done())
+        self._image_future.add_done_callback(self._on_image_loaded)
+
+    @property
+    def is_alive(self) -> bool:
+        return not self._destroyed
+
+    @property
+    def has_pending_image(self) -> bool:
+        return self._image_future is not None
+
+    def _on_image_loaded(self, future: Future):
+        # Wywoływane w wątku roboczym potoku (lub od razu, jeśli miniatura była w pamięci podręcznej)
+        if self._destroyed:
+            return
+        try:
+            self.frame.after(0, self._show_image, future)
+        except RuntimeError:
+            # Pętla zdarzeń Tk już nie działa (zamykanie aplikacji)
+            pass
+
+    def _show_image(self, future: Future):
+        if self._destroyed or future is not self._image_future:
+            return
+        self._image_future = None
+        if future.cancelled() or future.exception() is not None:
+            if not future.cancelled():
+                print(f"Error loading image: {future.exception()}")
+            self._image_label.configure(text="Błąd obrazu")
+            self._image_span.finish(status="error")
+            return
+        self._image = ctk.CTkImage(future.result(), size=self._pipeline.size)
+        self._image_label.configure(image=self._image, text="")
+        self._image_span.finish(status="shown")
+
+    def destroy(self):
+        """Anuluje oczekujące pobranie miniatury i usuwa kartę wraz z obrazem. Wywołanie ponowne nic nie robi."""
+        if self._destroyed:
+            return
+        self._destroyed = True
+        if self._image_future is not None:
+            self._pipeline.release(self.route.image_link, self._image_future)
+            self._image_future = None
+            self._image_span.finish(status="cancelled")
+        if self._image is not None:
+            # CTkLabel.destroy() nie wyrejestrowuje się z CTkImage - bez tego obraz i etykieta tworzą cykl
+            # referencji, a PhotoImage w Tk żyje do najbliższego przebiegu GC
+            self._image_label.configure(image=None)
+            self._image = None
+        self.frame.destroy()
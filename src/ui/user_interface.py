@@ -1,26 +1,41 @@
 # src/ui/user_interface.py
 
+import os
+
 import customtkinter as ctk
 import webbrowser
-import threading
-import requests
-from PIL import Image, ImageTk
-from io import BytesIO
 
 from src.recommenders.route_recommender import RouteRecommender
+from src.ui.image_pipeline import ImagePipeline
+from src.ui.route_card import RouteCard
+from src.utils.tracing import tracer
 from src.models.user_preference import UserPreference
 from src.utils.constants import TIME_RANGES, LENGTH_OPTIONS, TRICITY_COORDS, DIFFICULTY_MULTIPLIERS, \
-    CLOUD_COVER_PREFERENCES
+    CLOUD_COVER_PREFERENCES, MAX_RATING, RATING_SLIDER_STEP, TEMPERATURE_SLIDER_STEP
 
 # Ustawienie wyglądu
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("blue")
 
 
+def _resident_memory_bytes() -> int | None:
+    """Bieżąca pamięć rezydentna procesu (Linux, /proc); None, jeśli system jej nie udostępnia."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
 class App(ctk.CTk):
-    def __init__(self, recommender: RouteRecommender):
+    def __init__(self, recommender: RouteRecommender, image_pipeline: ImagePipeline | None = None):
         super().__init__()
         self.recommender = recommender
+        # Miniatury są dekodowane i zmniejszane poza wątkiem UI - tutaj tylko opakowujemy gotowe obrazy
+        self.image_pipeline = image_pipeline if image_pipeline is not None else ImagePipeline()
+        # Karty bieżących wyników - każda sama zwalnia swoje widżety, obraz i zamówienie miniatury
+        self._cards: list[RouteCard] = []
+        self._searches = 0
 
         self.title("Recommender Tras Spacerowych")
         self.geometry("1400x900")
@@ -29,9 +44,19 @@ class App(ctk.CTk):
         self.grid_columnconfigure(1, weight=4)
         self.grid_rowconfigure(0, weight=1)
 
+        # Czcionki kart tworzone raz - każda CTkFont to nowa nazwana czcionka w Tk
+        self._card_fonts = {
+            "title": ctk.CTkFont(size=16, weight="bold"),
+            "day": ctk.CTkFont(size=12, weight="bold")
+        }
+
         self._create_filter_frame()
         self._create_results_frame()
 
+        # F12 wypisuje raport pamięci sesji (diagnostyka wycieków)
+        self.bind("<F12>", lambda _event: print(self.memory_report()))
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
     def _update_rating_label(self, value):
         self.rating_value_label.configure(text=f"{value:.1f} ⭐")
 
@@ -92,7 +117,8 @@ class App(ctk.CTk):
         ctk.CTkLabel(rating_frame, text="Minimalna ocena:").grid(row=0, column=0, sticky="w")
         self.rating_value_label = ctk.CTkLabel(rating_frame, text="3.0 ⭐")
         self.rating_value_label.grid(row=0, column=1, sticky="e", padx=(0, 5))
-        self.widgets['rating'] = ctk.CTkSlider(rating_frame, from_=0, to=5, number_of_steps=50,
+        self.widgets['rating'] = ctk.CTkSlider(rating_frame, from_=0, to=MAX_RATING,
+                                               number_of_steps=round(MAX_RATING / RATING_SLIDER_STEP),
                                                command=self._update_rating_label)
         self.widgets['rating'].set(3.0)
         self.widgets['rating'].grid(row=1, column=0, columnspan=2, sticky="ew")
@@ -119,7 +145,8 @@ class App(ctk.CTk):
         ctk.CTkLabel(min_temp_frame, text="Min temp:").grid(row=0, column=0, sticky="w")
         self.min_temp_value_label = ctk.CTkLabel(min_temp_frame, text="-5°C")
         self.min_temp_value_label.grid(row=0, column=1, sticky="e")
-        self.widgets['min_temp'] = ctk.CTkSlider(min_temp_frame, from_=-20, to=40, number_of_steps=60,
+        self.widgets['min_temp'] = ctk.CTkSlider(min_temp_frame, from_=-20, to=40,
+                                                 number_of_steps=round(60 / TEMPERATURE_SLIDER_STEP),
                                                  command=self._update_min_temp_label)
         self.widgets['min_temp'].set(-5)
         self.widgets['min_temp'].grid(row=1, column=0, columnspan=2, sticky="ew")
@@ -131,7 +158,8 @@ class App(ctk.CTk):
         ctk.CTkLabel(max_temp_frame, text="Max temp:").grid(row=0, column=0, sticky="w")
         self.max_temp_value_label = ctk.CTkLabel(max_temp_frame, text="25°C")
         self.max_temp_value_label.grid(row=0, column=1, sticky="e")
-        self.widgets['max_temp'] = ctk.CTkSlider(max_temp_frame, from_=-20, to=40, number_of_steps=60,
+        self.widgets['max_temp'] = ctk.CTkSlider(max_temp_frame, from_=-20, to=40,
+                                                 number_of_steps=round(60 / TEMPERATURE_SLIDER_STEP),
                                                  command=self._update_max_temp_label)
         self.widgets['max_temp'].set(25)
         self.widgets['max_temp'].grid(row=1, column=0, columnspan=2, sticky="ew")
@@ -151,10 +179,42 @@ class App(ctk.CTk):
         self.results_frame = ctk.CTkScrollableFrame(self, label_text="Dostępne Trasy")
         self.results_frame.grid(row=0, column=1, padx=10, pady=10, sticky="nsew")
 
-    def _apply_filters(self):
+    def _clear_results(self):
+        for card in self._cards:
+            card.destroy()
+        self._cards.clear()
+        # Pozostałe widżety wyników, np. komunikat o braku tras
         for widget in self.results_frame.winfo_children():
             widget.destroy()
 
+    def _on_close(self):
+        # Anulowanie oczekujących miniatur przed zamknięciem, aby nie trafiały do niszczonych widżetów
+        self._clear_results()
+        self.destroy()
+
+    def _apply_filters(self):
+        # Cały czas wyszukiwania jako jeden ślad: odcinki recommendera, prognoz i kart dostają numer wyszukiwania
+        with tracer.search_span("search", "ui") as span:
+            with tracer.span("clear_results", "ui", cards=len(self._cards)):
+                self._clear_results()
+            self._searches += 1
+
+            recommendations = self.recommender.recommend(self._read_preferences())
+            span.set(routes=len(recommendations))
+
+            if not recommendations:
+                ctk.CTkLabel(self.results_frame, text="Brak tras spełniających kryteria.").pack(pady=20)
+                return
+
+            with tracer.span("render_cards", "ui", cards=len(recommendations)):
+                for recommendation in recommendations:
+                    self._display_route(recommendation['route'], recommendation['calendar'])
+            if tracer.enabled:
+                # Układ widżetów Tk liczy się leniwie - przy śledzeniu wymuszamy go, aby był widoczny w śladzie
+                with tracer.span("layout", "ui"):
+                    self.update_idletasks()
+
+    def _read_preferences(self) -> UserPreference:
         diff = self.widgets['difficulty'].get()
         time_r = self.widgets['time'].get()
 
@@ -170,7 +230,7 @@ class App(ctk.CTk):
         if min_temp_val > max_temp_val:
             min_temp_val, max_temp_val = max_temp_val, min_temp_val
 
-        prefs = UserPreference(
+        return UserPreference(
             preferred_difficulty=pref_diff.lower(),
             preferred_time_range=pref_time,
             min_length=float(self.widgets['min_len'].get()),
@@ -184,74 +244,33 @@ class App(ctk.CTk):
             max_temp=max_temp_val
         )
 
-        filtered_routes = self.recommender.filter_routes(prefs)
-
-        if not filtered_routes:
-            ctk.CTkLabel(self.results_frame, text="Brak tras spełniających kryteria.").pack(pady=20)
-            return
-
-        for route in filtered_routes:
-            self._display_route(route, prefs)
-
-    def _display_route(self, route, prefs):
-        # Ta metoda została lekko zmodyfikowana
-        route_frame = ctk.CTkFrame(self.results_frame)
-        route_frame.pack(padx=10, pady=10, fill="x")
-
-        top_frame = ctk.CTkFrame(route_frame, fg_color="transparent")
-        top_frame.pack(padx=10, pady=10, fill="x")
-        top_frame.grid_columnconfigure(0, weight=1)
-        top_frame.grid_columnconfigure(1, weight=3)
-
-        img_label = ctk.CTkLabel(top_frame, text="Ładowanie...")
-        img_label.grid(row=0, column=0, rowspan=2, padx=(0, 10), sticky="nw")
-        threading.Thread(target=self._load_image, args=(route.image_link, img_label), daemon=True).start()
-
-        info_frame = ctk.CTkFrame(top_frame, fg_color="transparent")
-        info_frame.grid(row=0, column=1, sticky="nsew")
-
-        ctk.CTkLabel(info_frame, text=route.name, font=ctk.CTkFont(size=16, weight="bold")).pack(anchor="w")
-        ctk.CTkLabel(info_frame,
-                     text=f"Region: {route.region} | Trudność: {route.difficulty.capitalize()} | Ocena: {route.rating} ⭐").pack(
-            anchor="w")
-
-        # === POCZĄTEK ZMIAN: Użycie nowej metody formatowania czasu ===
-        formatted_time = self._format_time(route.estimated_time_hours)
-        ctk.CTkLabel(info_frame, text=f"Długość: {route.length_km} km | Szacowany czas: {formatted_time}").pack(
-            anchor="w")
-        # === KONIEC ZMIAN ===
-
-        ctk.CTkButton(info_frame, text="Otwórz w AllTrails", command=lambda u=route.link: self._open_link(u)).pack(
-            anchor="w", pady=5)
-
-        comfort_data = self.recommender.calculate_daily_comfort_for_route(route, prefs)
-        calendar_frame = ctk.CTkFrame(route_frame)
-        calendar_frame.pack(fill="x", padx=10, pady=(0, 10))
-
-        for i, day_data in enumerate(comfort_data):
-            col = i % 7
-            row = i // 7
-            day_frame = ctk.CTkFrame(calendar_frame, fg_color=day_data['color'])
-            day_frame.grid(row=row, column=col, padx=5, pady=5, sticky="ew")
-
-            ctk.CTkLabel(day_frame, text=day_data['date'].strftime('%d.%m'),
-                         font=ctk.CTkFont(size=12, weight="bold")).pack()
-            ctk.CTkLabel(day_frame, text=f"{day_data['score']}%").pack()
-            calendar_frame.grid_columnconfigure(col, weight=1)
+    def _display_route(self, route, comfort_data):
+        with tracer.span("card", "ui", route_id=route.id):
+            self._cards.append(RouteCard(self.results_frame, route, comfort_data, self.image_pipeline,
+                                         self._card_fonts, self._format_time, self._open_link))
 
     def _open_link(self, url):
         webbrowser.open_new_tab(url)
 
-    def _load_image(self, url, label_widget):
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            img_data = response.content
-
-            pil_image = Image.open(BytesIO(img_data))
-            ctk_image = ctk.CTkImage(pil_image, size=(250, 150))
-
-            self.after(0, lambda: label_widget.configure(image=ctk_image, text=""))
-        except Exception as e:
-            print(f"Error loading image: {e}")
-            self.after(0, lambda: label_widget.configure(text="Błąd obrazu"))
\ No newline at end of file
+    def memory_report(self) -> dict:
+        """
+        Raport pamięci sesji: liczba kart i widżetów, obrazy zarejestrowane w Tk, stan pamięci podręcznej
+        miniatur i pamięć rezydentna procesu. Przy poprawnym zwalnianiu kart wartości nie rosną
+        z liczbą wyszukiwań.
+        """
+        widget_count = 0
+        pending = list(self.winfo_children())
+        while pending:
+            widget = pending.pop()
+            widget_count += 1
+            pending.extend(widget.winfo_children())
+
+        return {
+            "searches": self._searches,
+            "cards": len(self._cards),
+            "cards_waiting_for_image": sum(card.has_pending_image for card in self._cards),
+            "widgets": widget_count,
+            "tk_images": len(self.tk.call("image", "names")),
+            "image_pipeline": self.image_pipeline.stats(),
+            "resident_memory_bytes": _resident_memory_bytes()
+        }
@@ -55,4 +55,101 @@ TRICITY_COORDS = {
 NIGHT_HOURS = list(range(22, 24)) + list(range(0, 5))
 
 # Dni prognozy
-FORECAST_DAYS = 14
\ No newline at end of file
+FORECAST_DAYS = 14
+
+# Czas ważności prognozy w pamięci podręcznej (w sekundach)
+WEATHER_CACHE_EXPIRE_SECONDS = 3600
+
+# Ponawianie zapytań do API pogodowego
+WEATHER_RETRIES = 5
+WEATHER_BACKOFF_FACTOR = 0.2
+
+# Maksymalna liczba równoległych połączeń klienta asynchronicznego
+WEATHER_MAX_CONNECTIONS = 10
+
+# Godziny (UTC) kolejnych przebiegów modeli prognozy wykorzystywanych przez Open-Meteo
+FORECAST_MODEL_RUN_HOURS_UTC = (0, 3, 6, 9, 12, 15, 18, 21)
+
+# Opóźnienie odświeżania względem przebiegu modelu - tyle trwa zwykle publikacja wyników w API
+PREFETCH_OFFSET_MINUTES = 90
+
+# Losowe rozrzucenie momentu odświeżania (w sekundach), aby nie uderzać w API dokładnie o pełnej minucie
+PREFETCH_JITTER_SECONDS = 120
+
+# Maksymalna liczba jednoczesnych zapytań podczas odświeżania w tle
+PREFETCH_MAX_CONCURRENCY = 4
+
+# Kroki suwaków w interfejsie - wartości preferencji są do nich zaokrąglane przy przypisaniu
+TEMPERATURE_SLIDER_STEP = 1.0
+RATING_SLIDER_STEP = 0.1
+WEIGHT_STEP = 0.01
+
+# Maksymalna liczba zapamiętanych wyników wyszukiwania w RouteRecommender
+RESULT_CACHE_SIZE = 256
+
+# Wyniki strumieniowe: domyślna liczba najlepszych tras i rozmiar porcji katalogu
+DEFAULT_TOP_K = 20
+STREAM_CHUNK_SIZE = 64
+
+# Co ile sekund sprawdzać, czy plik z trasami został zmieniony
+CATALOGUE_WATCH_INTERVAL_SECONDS = 5.0
+
+# Miniatury zdjęć tras: rozmiar w pikselach (szerokość, wysokość) i pamięć podręczna gotowych miniatur
+THUMBNAIL_SIZE = (250, 150)
+IMAGE_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# Liczba procesów dekodujących zdjęcia i wątków pobierających je z sieci
+IMAGE_DECODE_WORKERS = 2
+IMAGE_DOWNLOAD_WORKERS = 8
+IMAGE_DOWNLOAD_TIMEOUT_SECONDS = 10
+
+# Bok komórki siatki indeksu przestrzennego tras (w stopniach, ok. 5,5 km w kierunku północ-południe)
+SPATIAL_INDEX_CELL_DEGREES = 0.05
+
+# Planer wycieczek: liczba kroków bisekcji przy dopasowywaniu planu do limitu łącznego czasu
+TRIP_PLANNER_MAX_ITERATIONS = 40
+
+# Limity zapytań do Open-Meteo (darmowy plan): nazwa -> (liczba zapytań, okres w sekundach)
+WEATHER_RATE_LIMITS = {
+    "minute": (600, 60),
+    "hour": (5000, 3600),
+    "day": (10000, 86400)
+}
+
+# Część każdego limitu zarezerwowana dla zapytań użytkownika (niedostępna dla odświeżania w tle)
+WEATHER_BACKGROUND_RESERVE = 0.2
+
+# Maksymalny czas oczekiwania zapytania użytkownika na wolny limit, zanim zostanie obsłużone z pamięci podręcznej
+WEATHER_BUDGET_MAX_WAIT_SECONDS = 2.0
+
+# Wagi składników indeksu komfortu (nazwy z src/recommenders/comfort_model.py). Domyślnie średnia
+# z temperatury, opadów i zachmurzenia; dostępne są też "sunshine" i "precipitation_probability".
+COMFORT_MODEL_WEIGHTS = {
+    "temperature": 1.0,
+    "precipitation": 1.0,
+    "cloud_cover": 1.0
+}
+
+# Liczba godzin prognozy przetwarzana naraz przez model komfortu (bloki mieszczą się w pamięci podręcznej CPU)
+COMFORT_BLOCK_HOURS = 4096
+
+# Profile preferencji eksportowane do statycznych migawek rekomendacji: nazwa pliku -> pola UserPreference
+SNAPSHOT_PROFILES = {
+    "trojmiasto": {"preferred_city": "Trójmiasto", "preferred_time_range": "dowolny", "max_length": 50.0},
+    "gdansk": {"preferred_city": "Gdańsk", "preferred_time_range": "dowolny", "max_length": 50.0},
+    "gdynia": {"preferred_city": "Gdynia", "preferred_time_range": "dowolny", "max_length": 50.0},
+    "sopot": {"preferred_city": "Sopot", "preferred_time_range": "dowolny", "max_length": 50.0},
+    "trojmiasto-krotkie": {"preferred_city": "Trójmiasto", "preferred_difficulty": "easy",
+                           "preferred_time_range": "do 2 godzin", "max_length": 10.0}
+}
+
+# Migawki: liczba tras na profil, rozmiar pola jednego dnia na pasku komfortu (px) i liczba wątków zapisu
+SNAPSHOT_ROUTES_PER_PROFILE = 20
+SNAPSHOT_HEAT_STRIP_CELL = (12, 12)
+SNAPSHOT_WRITE_WORKERS = 4
+
+# Śledzenie czasu wyszukiwań (format Chrome trace-event): rozmiar pliku przed rotacją, liczba starych plików
+# i maksymalne opóźnienie zapisu zbuforowanych zdarzeń
+TRACE_MAX_FILE_BYTES = 10 * 1024 * 1024
+TRACE_BACKUP_COUNT = 5
+TRACE_FLUSH_INTERVAL_SECONDS = 1.0
\ No newline at end of file
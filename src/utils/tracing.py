@@ -0,0 +1,272 @@
+import contextvars
+import itertools
+import json
+import os
+import threading
+import time
+
+from src.utils.constants import TRACE_MAX_FILE_BYTES, TRACE_BACKUP_COUNT, TRACE_FLUSH_INTERVAL_SECONDS
+
+# Numer bieżącego wyszukiwania - dopisywany do każdego odcinka w tym samym wątku (i kontekście)
+_current_search: contextvars.ContextVar[int | None] = contextvars.ContextVar("trace_search", default=None)
+
+
+class Span:
+    """
+    Odcinek czasu zapisywany jako zdarzenie "X" (complete event) formatu Chrome trace-event.
+    Argumenty (np. cache_hit) można uzupełniać w trakcie przez set().
+    """
+
+    __slots__ = ("_tracer", "_name", "_category", "_args", "_start_us", "_search_token")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict, new_search: bool):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._args = args
+        self._search_token = None
+        if new_search:
+            self._search_token = _current_search.set(next(tracer._search_ids))
+        search = _current_search.get()
+        if search is not None:
+            self._args["search"] = search
+
+    def set(self, **args):
+        self._args.update(args)
+
+    def __enter__(self) -> "Span":
+        self._start_us = self._tracer.now_us()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        end_us = self._tracer.now_us()
+        if exc_type is not None:
+            self._args["error"] = exc_type.__name__
+        self._tracer.emit({"name": self._name, "cat": self._category, "ph": "X", "ts": self._start_us,
+                           "dur": end_us - self._start_us, "args": self._args})
+        if self._search_token is not None:
+            _current_search.reset(self._search_token)
+            # Koniec wyszukiwania - zlecamy zapis od razu, aby ślad był dostępny do analizy
+            self._tracer.flush()
+        return False
+
+
+class _NullSpan:
+    """Odcinek wyłączonego śledzenia - nic nie zapisuje i prawie nic nie kosztuje."""
+
+    __slots__ = ()
+
+    def set(self, **args):
+        pass
+
+    def __enter__(self) -> "_NullSpan":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class AsyncSpan:
+    """
+    Odcinek, który zaczyna się i kończy w różnych miejscach (np. od zamówienia miniatury do jej wyświetlenia).
+    Zapisywany jako para zdarzeń "b"/"e" z identyfikatorem, więc przeglądarka śladów łączy je w jeden pasek.
+    """
+
+    __slots__ = ("_tracer", "_event", "_finished")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: dict):
+        self._tracer = tracer
+        search = _current_search.get()
+        if search is not None:
+            args["search"] = search
+        self._event = {"name": name, "cat": category, "id": next(tracer._async_ids), "args": args}
+        self._finished = False
+        tracer.emit({**self._event, "ph": "b", "ts": tracer.now_us()})
+
+    def finish(self, **args):
+        """Kończy odcinek (kolejne wywołania nic nie robią)."""
+        if self._finished:
+            return
+        self._finished = True
+        self._tracer.emit({**self._event, "ph": "e", "ts": self._tracer.now_us(), "args": args})
+
+
+class _NullAsyncSpan:
+    __slots__ = ()
+
+    def finish(self, **args):
+        pass
+
+
+_NULL_ASYNC_SPAN = _NullAsyncSpan()
+
+
+class Tracer:
+    """
+    Zapis odcinków czasu do pliku w formacie Chrome trace-event (JSON Array Format), który można otworzyć
+    w chrome://tracing lub ui.perfetto.dev i prześledzić ścieżkę krytyczną pojedynczego wyszukiwania.
+
+    Każde zdarzenie ma znacznik czasu w mikrosekundach (zegar monotoniczny zakotwiczony w czasie UNIX),
+    identyfikator procesu i wątku; odcinki w wątku wyszukiwania mają też argument "search" z numerem
+    wyszukiwania. Zdarzenia są buforowane i dopisywane do pliku przez osobny wątek zapisu po zakończeniu
+    wyszukiwania albo najpóźniej po TRACE_FLUSH_INTERVAL_SECONDS - emit() tylko dopisuje zdarzenie do bufora,
+    więc ani wątek interfejsu, ani wątki robocze nie czekają na dysk. Nazwa wątku jest zapisywana przy jego
+    pierwszym zdarzeniu oraz powtarzana na początku każdego nowego pliku. Plik większy niż max_bytes jest
+    przenoszony (ślad.1.json, ślad.2.json, ...), a najstarszy usuwany. Format dopuszcza brak zamykającego
+    nawiasu, więc każdy plik jest od razu czytelny.
+
+    Domyślnie śledzenie jest wyłączone - span() zwraca wtedy pusty odcinek.
+    """
+
+    def __init__(self):
+        self._enabled = False
+        self._path: str | None = None
+        self._max_bytes = TRACE_MAX_FILE_BYTES
+        self._backup_count = TRACE_BACKUP_COUNT
+        self._lock = threading.Lock()
+        # Budzi wątek zapisu: pierwsze zdarzenie w pustym buforze, flush() albo close()
+        self._wakeup = threading.Condition(self._lock)
+        self._buffer: list[dict] = []
+        self._writer: threading.Thread | None = None
+        self._flush_requested = False
+        self._closing = False
+        self._thread_names: dict[int, str] = {}
+        self._search_ids = itertools.count(1)
+        self._async_ids = itertools.count(1)
+        self._pid = os.getpid()
+        # Kotwica: zegar monotoniczny (dokładny) przeliczany na czas UNIX (porównywalny między plikami)
+        self._epoch_us = time.time_ns() // 1000
+        self._perf_origin_ns = time.perf_counter_ns()
+
+    @property
+    def enabled(self) -> bool:
+        return self._enabled
+
+    def configure(self, path: str, max_bytes: int = TRACE_MAX_FILE_BYTES, backup_count: int = TRACE_BACKUP_COUNT):
+        """Włącza śledzenie z zapisem do pliku path (np. traces/trace.json)."""
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            self._path = path
+            self._max_bytes = max_bytes
+            self._backup_count = backup_count
+            self._enabled = True
+            self._closing = False
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(target=self._writer_loop, name="trace-writer", daemon=True)
+                self._writer.start()
+        print(f"Tracing enabled, writing to {path}.")
+
+    def now_us(self) -> int:
+        return self._epoch_us + (time.perf_counter_ns() - self._perf_origin_ns) // 1000
+
+    def span(self, name: str, category: str = "app", **args) -> Span | _NullSpan:
+        """Odcinek jako menedżer kontekstu: with tracer.span("fetch", "weather", lat=...) as span: ..."""
+        if not self._enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, args, new_search=False)
+
+    def search_span(self, name: str, category: str = "app", **args) -> Span | _NullSpan:
+        """Odcinek rozpoczynający nowe wyszukiwanie - odcinki zagnieżdżone dostają jego numer."""
+        if not self._enabled:
+            return _NULL_SPAN
+        return Span(self, name, category, args, new_search=True)
+
+    def start_async(self, name: str, category: str = "app", **args) -> AsyncSpan | _NullAsyncSpan:
+        if not self._enabled:
+            return _NULL_ASYNC_SPAN
+        return AsyncSpan(self, name, category, args)
+
+    def emit(self, event: dict):
+        thread = threading.current_thread()
+        event["pid"] = self._pid
+        event["tid"] = thread.native_id
+        with self._lock:
+            if not self._enabled:
+                return
+            if thread.native_id not in self._thread_names:
+                # Nazwa wątku zapisywana przy jego pierwszym zdarzeniu, aby przeglądarka od razu opisała wiersz
+                self._thread_names[thread.native_id] = thread.name
+                self._buffer.append(self._thread_name_event(thread.native_id, thread.name))
+            self._buffer.append(event)
+            if len(self._buffer) == 1:
+                self._wakeup.notify()
+
+    def flush(self):
+        """Zleca wątkowi zapisu natychmiastowe dopisanie zbuforowanych zdarzeń do pliku (nie czeka na zapis)."""
+        with self._lock:
+            self._flush_requested = True
+            self._wakeup.notify()
+
+    def _writer_loop(self):
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closing:
+                    self._wakeup.wait()
+                # Zdarzenia zbierane są najwyżej przez TRACE_FLUSH_INTERVAL_SECONDS, chyba że zlecono zapis
+                deadline = time.monotonic() + TRACE_FLUSH_INTERVAL_SECONDS
+                while not self._flush_requested and not self._closing:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.wait(remaining)
+                self._flush_requested = False
+                events, self._buffer = self._buffer, []
+                path, thread_names, closing = self._path, dict(self._thread_names), self._closing
+            # Zapis i rotacja poza blokadą - emit() w innych wątkach nie czeka na dysk
+            if events and path is not None:
+                try:
+                    self._write(path, events, thread_names)
+                except OSError as e:
+                    print(f"Błąd zapisu śladu do {path}: {e}")
+            if closing:
+                return
+
+    def _write(self, path: str, events: list[dict], thread_names: dict[int, str]):
+        if os.path.exists(path) and os.path.getsize(path) >= self._max_bytes:
+            self._rotate(path)
+        new_file = not os.path.exists(path)
+        with open(path, "a", encoding="utf-8") as f:
+            if new_file:
+                f.write("[\n")
+                # Nazwy wątków na początku każdego pliku, aby przeglądarka opisała wiersze także po rotacji
+                # (z pominięciem wątków, których nazwa i tak jest w zapisywanej porcji)
+                named = {event["tid"] for event in events if event["ph"] == "M"}
+                f.writelines(json.dumps(self._thread_name_event(tid, name)) + ",\n"
+                             for tid, name in thread_names.items() if tid not in named)
+            f.writelines(json.dumps(event, ensure_ascii=False, default=str) + ",\n" for event in events)
+
+    def _thread_name_event(self, tid: int, name: str) -> dict:
+        return {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": tid, "args": {"name": name}}
+
+    def _rotate(self, path: str):
+        stem, extension = os.path.splitext(path)
+        oldest = f"{stem}.{self._backup_count}{extension}"
+        if os.path.exists(oldest):
+            os.remove(oldest)
+        for index in range(self._backup_count - 1, 0, -1):
+            source = f"{stem}.{index}{extension}"
+            if os.path.exists(source):
+                os.replace(source, f"{stem}.{index + 1}{extension}")
+        if self._backup_count > 0:
+            os.replace(path, f"{stem}.1{extension}")
+        else:
+            os.remove(path)
+
+    def close(self):
+        """Wyłącza śledzenie i czeka, aż wątek zapisu dopisze pozostałe zdarzenia."""
+        with self._lock:
+            self._enabled = False
+            self._closing = True
+            self._wakeup.notify()
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.join()
+
+
+# Wspólny obiekt śledzenia aplikacji - włączany w main.py przez tracer.configure()
+tracer = Tracer()